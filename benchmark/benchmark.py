@@ -133,6 +133,57 @@ def benchmark(validr):
         print_item(name, subname, '{:>8}'.format(round(base / v * 1000)))
 
 
+def make_isomorph_schema(num_fields):
+    elements = [
+        'int.min(0).max(9).optional',
+        "str.maxlen(64).desc('name')",
+        'float.exmin(0).default(1.5)',
+        'bool.default(false)',
+        "date.format('%Y-%m-%d').optional",
+        'email.optional',
+    ]
+    schema = {}
+    for i in range(num_fields):
+        element = elements[i % len(elements)]
+        # unique desc make every element distinct, cache can not help
+        schema['field_{}'.format(i)] = "{}.desc('field {}')".format(element, i)
+    return schema
+
+
+@cli.command()
+@click.option('--fields', default=2000, help='number of schema fields')
+def parse(fields):
+    """benchmark isomorph schema parsing"""
+    import element_pyparsing
+    from validr import T
+    from validr.schema import _parse_element, _parse_element_text
+
+    schema = make_isomorph_schema(fields)
+    texts = list(schema.values())
+
+    def parse_all(parse):
+        for text in texts:
+            parse(text)
+
+    _parse_element.cache_clear()
+    cases = {
+        'pyparsing': lambda: parse_all(element_pyparsing.parse_element),
+        'validr': lambda: parse_all(_parse_element_text),
+        'validr-cached': lambda: parse_all(_parse_element),
+        'T(json)': lambda: T(dict(schema)),
+    }
+    print('timeits'.center(60, '-'))
+    result = {}
+    for name, f in cases.items():
+        n, t = Timer(f).autorange()
+        result[name] = t / n
+        print_item('parse', name, '{:>8} loops cost {:.3f}s'.format(n, t))
+    print('speedup'.center(60, '-'))
+    base = result['pyparsing']
+    for name, v in result.items():
+        print_item('parse', name, '{:>8.1f}x'.format(base / v))
+
+
 @cli.command()
 def profile():
     """profile validr"""
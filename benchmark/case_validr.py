@@ -21,6 +21,8 @@ class Model:
 
 compiler = Compiler()
 default = compiler.compile(T(Model))
+codegen = Compiler(backend='codegen').compile(T(Model))
+lazy_position = Compiler(lazy_position=True).compile(T(Model))
 
 any_validators = {}
 for name, v in builtin_validators.items():
@@ -36,4 +38,4 @@ def model(value):
     return asdict(Model(value))
 
 
-CASES = {"default": default, "model": model, "any": any_case}
+CASES = {"default": default, "codegen": codegen, "lazy_position": lazy_position, "model": model, "any": any_case}
@@ -0,0 +1,54 @@
+"""
+The pyparsing element grammar used before validr 1.3, kept for benchmark
+"""
+from pyparsing import (
+    Group,
+    Keyword,
+    Optional,
+    StringEnd,
+    StringStart,
+    Suppress,
+    ZeroOrMore,
+    pyparsing_common,
+    quotedString,
+    removeQuotes,
+    replaceWith,
+)
+
+
+def _make_keyword(kwd_str, kwd_value):
+    return Keyword(kwd_str).setParseAction(replaceWith(kwd_value))
+
+
+def _define_value():
+    TRUE = _make_keyword('true', True)
+    FALSE = _make_keyword('false', False)
+    NULL = _make_keyword('null', None)
+    STRING = quotedString().setParseAction(removeQuotes)
+    NUMBER = pyparsing_common.number()
+    return TRUE | FALSE | NULL | STRING | NUMBER
+
+
+def _define_element():
+    VALIDATOR = pyparsing_common.identifier.setName('validator').setResultsName('validator')
+    ITEMS = _define_value().setName('items').setResultsName('items')
+    ITEMS_WRAPPER = Optional(Suppress('(') + ITEMS + Suppress(')'))
+    PARAMS_KEY = pyparsing_common.identifier.setName('key').setResultsName('key')
+    PARAMS_VALUE = _define_value().setName('value').setResultsName('value')
+    PARAMS_VALUE_WRAPPER = Optional(Suppress('(') + PARAMS_VALUE + Suppress(')'))
+    PARAMS_KEY_VALUE = Group(Suppress('.') + PARAMS_KEY + PARAMS_VALUE_WRAPPER)
+    PARAMS = Group(ZeroOrMore(PARAMS_KEY_VALUE)).setName('params').setResultsName('params')
+    return StringStart() + VALIDATOR + ITEMS_WRAPPER + PARAMS + StringEnd()
+
+
+ELEMENT_GRAMMAR = _define_element()
+
+
+def parse_element(text):
+    """Parse element text, return (validator, items, params)"""
+    result = ELEMENT_GRAMMAR.parseString(text.strip(), parseAll=True)
+    items = result['items'] if 'items' in result else None
+    params = {}
+    for item in result['params']:
+        params[item['key']] = item['value'] if 'value' in item else True
+    return result['validator'], items, params
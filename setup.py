@@ -31,7 +31,6 @@ _SETUP_OPTIONS = dict(
     include_package_data=True,
     install_requires=[
         'idna>=2.5',
-        'pyparsing>=2.1.0',
     ],
     zip_safe=False,
     classifiers=[
@@ -1,5 +1,5 @@
 """A simple, fast, extensible python library for data validation."""
-from .model import ImmutableInstanceError, asdict, fields, modelclass
+from .model import ImmutableInstanceError, asdict, fields, modelclass, warmup
 from .schema import Builder, Compiler, Schema, T
 from .validator import (
     Invalid,
@@ -20,5 +20,5 @@ __all__ = (
     'create_re_validator', 'create_enum_validator',
     'builtin_validators', 'validator',
     'Schema', 'Compiler', 'T', 'Builder',
-    'modelclass', 'fields', 'asdict', 'ImmutableInstanceError',
+    'modelclass', 'fields', 'asdict', 'warmup', 'ImmutableInstanceError',
 )
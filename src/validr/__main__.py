@@ -0,0 +1,52 @@
+"""
+Validate JSON Lines file against schema
+
+    python -m validr schema.json data.jsonl -o valid.jsonl -e errors.jsonl
+
+The schema file contains isomorph schema in JSON, eg:
+
+    {"id": "int.min(0)", "tags": ["str"]}
+
+Exit status is 1 if any line is invalid.
+"""
+import argparse
+import contextlib
+import json
+import sys
+
+from .schema import Compiler, T
+
+
+def _open_output(path, default):
+    if path == '-':
+        return contextlib.nullcontext(default.buffer)
+    return open(path, 'wb')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m validr',
+        description='Validate JSON Lines file against schema.')
+    parser.add_argument('schema', help='JSON file of isomorph schema')
+    parser.add_argument('input', help='JSON Lines file to validate')
+    parser.add_argument('-o', '--output', default='-',
+                        help='write valid records to file, default stdout')
+    parser.add_argument('-e', '--errors', default='-',
+                        help='write error report to file, default stderr')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='number of worker processes, default cpu count')
+    parser.add_argument('--chunksize', type=int, default=16 * 1024 * 1024,
+                        help='approximate bytes per task')
+    args = parser.parse_args(argv)
+    with open(args.schema, 'r', encoding='utf-8') as f:
+        schema = T(json.load(f))
+    with _open_output(args.output, sys.stdout) as output, \
+            _open_output(args.errors, sys.stderr) as errors:
+        result = Compiler().validate_ndjson(
+            schema, args.input, output, errors,
+            workers=args.workers, chunksize=args.chunksize)
+    return 1 if result.invalid else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,468 @@
+"""
+Code generation compile backend
+
+The closure backend calls several nested closures for every field and
+marks error position by `with mark_key(...)`. This backend walks the
+schema tree and generates one flat python function per schema:
+
+- dict and list schemas are inlined as plain assignments and loops
+- null, default and optional handling of validators are inlined
+- int, float and str checks are inlined
+- error position is marked by try/except, which is free when valid
+
+Schemas which can not be inlined, eg: union, model and custom validators
+without spec, are compiled by the closure backend and called directly.
+The generated function give the same results and errors as the closure
+backend.
+
+The result mode generates function which return `(value, None)` or
+`(None, error)`, errors of inlined checks are created with their position
+and returned directly, no exception is raised for them.
+"""
+import math
+import sys
+
+from .validator import MAX_INT, Invalid, ValidrError, _record_class, builtin_validators
+
+_INLINE_DICT_PARAMS = {'optional', 'desc', 'minlen', 'maxlen', 'slim', 'record'}
+_INLINE_LIST_PARAMS = {'optional', 'desc', 'minlen', 'maxlen'}
+_COMMON_PARAMS = {
+    'optional', 'default', 'desc', 'invalid_to', 'invalid_to_default',
+}
+# wide dict schemas call the closure validator for sparse inputs,
+# which validate only present keys
+_SPARSE_MIN_KEYS = 32
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _invalid(message, value, marks):
+    ex = Invalid(message, value=value)
+    ex.marks.extend(marks)
+    return ex
+
+
+def _mark(ex, marks):
+    ex.marks.extend(marks)
+    return ex
+
+
+class _CodeGen:
+
+    def __init__(self, compiler, prefix='', result=False):
+        # the closure compiler
+        self.compiler = compiler
+        # prefix of generated names, keep names unique in shared namespace
+        self.prefix = prefix
+        # return errors instead of raise
+        self.result = result
+        # return input dicts and lists as is if no item changed
+        self.reuse = getattr(compiler, 'reuse', False)
+        self.namespace = {
+            'Invalid': Invalid,
+            'ValidrError': ValidrError,
+            '_tuple_new': tuple.__new__,
+        }
+        if result:
+            self.namespace.update(_invalid=_invalid, _mark=_mark)
+        self.lines = []
+        self.counter = 0
+        # result mode states: input names of nodes, position marks from
+        # outer to inner, and (dst, invalid_to) of current leaf
+        self.values = []
+        self.marks = []
+        self.supress = None
+
+    def name(self, prefix):
+        self.counter += 1
+        return '{}{}{}'.format(self.prefix, prefix, self.counter)
+
+    def const(self, value, prefix='c'):
+        name = self.name(prefix)
+        self.namespace[name] = value
+        return name
+
+    def number(self, value):
+        # number literal is faster than global name
+        if isinstance(value, float) and not math.isfinite(value):
+            return self.const(value)
+        return repr(value)
+
+    def emit(self, indent, line):
+        self.lines.append('    ' * indent + line)
+
+    def marks_expr(self):
+        marks = ''.join(m + ', ' for m in reversed(self.marks))
+        return '({})'.format(marks.rstrip())
+
+    def fail(self, indent, message, from_none=False):
+        """Raise or return Invalid(message) of current node"""
+        if not self.result:
+            suffix = ' from None' if from_none else ''
+            self.emit(indent, 'raise Invalid({!r}){}'.format(message, suffix))
+        elif self.supress is not None:
+            self.emit(indent, '{} = {}'.format(*self.supress))
+            self.emit(indent, 'break')
+        else:
+            self.emit(indent, 'return None, _invalid({!r}, {}, {})'.format(
+                message, self.values[-1], self.marks_expr()))
+
+    def call(self, indent, dst, func, src, set_value):
+        """Call validate function, return it's error in result mode"""
+        line = '{} = {}({})'.format(dst, func, src)
+        if not self.result:
+            self.emit(indent, line)
+            return
+        self.emit(indent, 'try:')
+        self.emit(indent + 1, line)
+        self.emit(indent, 'except Invalid as ex:')
+        if self.supress is not None:
+            self.emit(indent + 1, '{} = {}'.format(*self.supress))
+            self.emit(indent + 1, 'break')
+            return
+        if set_value:
+            self.emit(indent + 1, 'ex.set_value({})'.format(src))
+        self.emit(indent + 1, 'return None, _mark(ex, {})'.format(self.marks_expr()))
+
+    def begin(self, src, indent):
+        """Begin code of node, return indent of node body"""
+        self.values.append(src)
+        if self.result:
+            return indent
+        self.emit(indent, 'try:')
+        return indent + 1
+
+    def is_builtin(self, schema, name):
+        if schema.validator != name:
+            return False
+        return self.compiler.validators.get(name) is builtin_validators[name]
+
+    def can_inline(self, schema):
+        params = set(schema.params)
+        if self.is_builtin(schema, 'dict'):
+            return (schema.items is not None and
+                    params.issubset(_INLINE_DICT_PARAMS))
+        if self.is_builtin(schema, 'list'):
+            return (schema.items is not None and
+                    params.issubset(_INLINE_LIST_PARAMS) and
+                    all(_is_int(schema.params[k])
+                        for k in ('minlen', 'maxlen') if k in params))
+        return False
+
+    def node(self, schema, src, dst, indent, mark=None):
+        """Generate code of schema
+
+        Args:
+            src (str): name of input value
+            dst (str): name of output value
+            mark (str): statement to mark error position, eg: ex.mark_key(k)
+        """
+        if not self.can_inline(schema):
+            self.leaf_node(schema, src, dst, indent, mark)
+        elif schema.validator == 'dict':
+            self.dict_node(schema, src, dst, indent, mark)
+        else:
+            self.list_node(schema, src, dst, indent, mark)
+
+    def handlers(self, src, dst, indent, mark, invalid_to=None):
+        """End code of node"""
+        self.values.pop()
+        if self.result:
+            return
+        # one try statement for both set value and mark position
+        self.emit(indent, 'except Invalid as ex:')
+        self.emit(indent + 1, 'ex.set_value({})'.format(src))
+        if invalid_to is not None:
+            self.emit(indent + 1, '{} = {}'.format(dst, invalid_to))
+        else:
+            if mark:
+                self.emit(indent + 1, mark)
+            self.emit(indent + 1, 'raise')
+        if mark:
+            self.emit(indent, 'except ValidrError as ex:')
+            self.emit(indent + 1, mark)
+            self.emit(indent + 1, 'raise')
+
+    def get_value(self, src, key, is_dict):
+        return '{x}.get({k}, None) if {d} else getattr({x}, {k}, None)'.format(
+            x=src, k=key, d=is_dict)
+
+    def null_branch(self, spec, dst, indent):
+        if spec.has_default:
+            self.emit(indent, '{} = {}'.format(dst, self.const(spec.default)))
+        elif spec.optional:
+            self.emit(indent, '{} = {!r}'.format(dst, spec.null_output))
+        else:
+            self.fail(indent, 'required')
+
+    def container_null_check(self, schema, src, dst, indent):
+        self.emit(indent, 'if {} is None:'.format(src))
+        if schema.params.get('optional'):
+            self.emit(indent + 1, '{} = None'.format(dst))
+        else:
+            self.fail(indent + 1, 'required')
+        self.emit(indent, 'else:')
+
+    def dict_node(self, schema, src, dst, indent, mark):
+        body = self.begin(src, indent)
+        self.container_null_check(schema, src, dst, body)
+        ind = body + 1
+        num_keys = len(schema.items)
+        if num_keys >= _SPARSE_MIN_KEYS:
+            f = self.const(self.compiler.compile(schema), 'f')
+            self.emit(ind, 'if type({x}) is dict and len({x}) * 2 < {n}:'
+                      .format(x=src, n=num_keys))
+            self.call(ind + 1, dst, f, src, set_value=False)
+            self.emit(ind, 'else:')
+            ind += 1
+        is_dict = self.name('d')
+        self.emit(ind, "{d} = hasattr({x}, '__getitem__') and hasattr({x}, 'get')"
+                  .format(d=is_dict, x=src))
+        outputs = []
+        results = []
+        unchanged = ['type({}) is dict'.format(src),
+                     'len({}) == {}'.format(src, num_keys)]
+        for key, inner in schema.items.items():
+            x = self.name('x')
+            r = self.name('r')
+            k = repr(key)
+            self.emit(ind, '{} = {}'.format(x, self.get_value(src, k, is_dict)))
+            self.marks.append('(True, {})'.format(k))
+            self.node(inner, x, r, ind, 'ex.mark_key({})'.format(k))
+            self.marks.pop()
+            outputs.append('{}: {}'.format(k, r))
+            results.append(r)
+            unchanged.append('{r} is {x} and ({x} is not None or {k} in {d})'
+                             .format(r=r, x=x, k=k, d=src))
+        if schema.params.get('record'):
+            record_class = self.const(_record_class(tuple(schema.items)), 'rc')
+            values = ''.join(r + ', ' for r in results)
+            self.emit(ind, '{} = _tuple_new({}, ({}))'.format(dst, record_class, values))
+        elif self.reuse and not schema.params.get('slim'):
+            self.emit(ind, 'if {}:'.format(' and '.join(unchanged)))
+            self.emit(ind + 1, '{} = {}'.format(dst, src))
+            self.emit(ind, 'else:')
+            self.emit(ind + 1, '{} = {{{}}}'.format(dst, ', '.join(outputs)))
+        else:
+            self.emit(ind, '{} = {{{}}}'.format(dst, ', '.join(outputs)))
+        if schema.params.get('slim'):
+            self.emit(ind, ("{r} = {{k: v for k, v in {r}.items() "
+                            "if not (v is None or v == '')}}").format(r=dst))
+        self.handlers(src, dst, indent, mark)
+
+    def list_node(self, schema, src, dst, indent, mark):
+        minlen = schema.params.get('minlen', 0)
+        maxlen = schema.params.get('maxlen', 1024)
+        body = self.begin(src, indent)
+        self.container_null_check(schema, src, dst, body)
+        ind = body + 1
+        it = self.name('it')
+        i = self.name('i')
+        x = self.name('x')
+        r = self.name('r')
+        append = self.name('append')
+        self.emit(ind, 'try:')
+        self.emit(ind + 1, '{} = enumerate({})'.format(it, src))
+        self.emit(ind, 'except TypeError:')
+        self.fail(ind + 1, 'not list')
+        if self.reuse:
+            same = self.name('same')
+            self.emit(ind, '{} = type({}) is list'.format(same, src))
+        self.emit(ind, '{} = []'.format(dst))
+        self.emit(ind, '{} = {}.append'.format(append, dst))
+        self.emit(ind, '{} = -1'.format(i))
+        self.emit(ind, 'for {}, {} in {}:'.format(i, x, it))
+        self.emit(ind + 1, 'if {} >= {}:'.format(i, self.number(maxlen)))
+        self.fail(ind + 2, 'list length must <= %d' % maxlen)
+        self.marks.append('(False, {})'.format(i))
+        self.node(schema.items, x, r, ind + 1, 'ex.mark_index({})'.format(i))
+        self.marks.pop()
+        if self.reuse:
+            # build output list since the first changed item
+            self.emit(ind + 1, 'if {}:'.format(same))
+            self.emit(ind + 2, 'if {} is {}:'.format(r, x))
+            self.emit(ind + 3, 'continue')
+            self.emit(ind + 2, '{} = False'.format(same))
+            self.emit(ind + 2, '{} = {}[:{}]'.format(dst, src, i))
+            self.emit(ind + 2, '{} = {}.append'.format(append, dst))
+        self.emit(ind + 1, '{}({})'.format(append, r))
+        if minlen > 0:
+            self.emit(ind, 'if {} + 1 < {}:'.format(i, self.number(minlen)))
+            self.fail(ind + 1, 'list length must >= %d' % minlen)
+        if self.reuse:
+            self.emit(ind, 'if {}:'.format(same))
+            self.emit(ind + 1, '{} = {}'.format(dst, src))
+        self.handlers(src, dst, indent, mark)
+
+    def leaf_node(self, schema, src, dst, indent, mark):
+        validate = self.compiler.compile(schema)
+        spec = getattr(validate, '__validate_spec__', None)
+        if spec is None:
+            f = self.const(validate, 'f')
+            if not mark or self.result:
+                self.call(indent, dst, f, src, set_value=False)
+                return
+            self.emit(indent, 'try:')
+            self.call(indent + 1, dst, f, src, set_value=False)
+            self.emit(indent, 'except ValidrError as ex:')
+            self.emit(indent + 1, mark)
+            self.emit(indent + 1, 'raise')
+            return
+        invalid_to = None
+        if spec.supress_invalid:
+            invalid_to = self.const(spec.invalid_to)
+        ind = self.begin(src, indent)
+        if self.result and invalid_to is not None:
+            # break out when invalid, like goto
+            self.supress = (dst, invalid_to)
+            self.emit(ind, 'while True:')
+            ind += 1
+        if spec.accept_string:
+            self.emit(ind, "if {x} is None or {x} == '':".format(x=src))
+        else:
+            self.emit(ind, 'if {} is None:'.format(src))
+        self.null_branch(spec, dst, ind + 1)
+        self.emit(ind, 'else:')
+        if not spec.accept_object:
+            self.emit(ind + 1, 'if not isinstance({}, str):'.format(src))
+            self.fail(ind + 2, 'require string value')
+        body = self.inline_body(schema)
+        if body is None:
+            f = self.const(spec.validate, 'f')
+            self.call(ind + 1, dst, f, src, set_value=True)
+            maybe_null = True
+        else:
+            maybe_null = body(schema, src, dst, ind + 1)
+        if maybe_null:
+            if spec.accept_string:
+                self.emit(ind + 1, "if {r} is None or {r} == '':".format(r=dst))
+            else:
+                self.emit(ind + 1, 'if {} is None:'.format(dst))
+            self.null_branch(spec, dst, ind + 2)
+        if self.supress is not None:
+            self.emit(ind, 'break')
+            self.supress = None
+        self.handlers(src, dst, indent, mark, invalid_to)
+
+    def inline_body(self, schema):
+        params = {k: v for k, v in schema.params.items()
+                  if k not in _COMMON_PARAMS}
+        if self.is_builtin(schema, 'int'):
+            if schema.items is None and set(params) <= {'min', 'max'}:
+                if all(_is_number(v) for v in params.values()):
+                    return self.int_body
+        elif self.is_builtin(schema, 'float'):
+            if schema.items is None and set(params) <= {'min', 'max', 'exmin', 'exmax'}:
+                if all(_is_number(v) or isinstance(v, bool) for v in params.values()):
+                    return self.float_body
+        elif self.is_builtin(schema, 'str'):
+            if schema.items is None and set(params) <= {'minlen', 'maxlen', 'strip'}:
+                if all(_is_int(params[k]) for k in ('minlen', 'maxlen') if k in params):
+                    return self.str_body
+        return None
+
+    def int_body(self, schema, src, dst, indent):
+        min_value = int(schema.params.get('min', -MAX_INT))
+        max_value = int(schema.params.get('max', MAX_INT))
+        self.emit(indent, 'try:')
+        self.emit(indent + 1, '{} = int({})'.format(dst, src))
+        self.emit(indent, 'except Exception:')
+        self.fail(indent + 1, 'invalid int', from_none=True)
+        self.emit(indent, 'if {} < {}:'.format(dst, self.number(min_value)))
+        self.fail(indent + 1, 'value must >= %d' % min_value)
+        self.emit(indent, 'elif {} > {}:'.format(dst, self.number(max_value)))
+        self.fail(indent + 1, 'value must <= %d' % max_value)
+        return False
+
+    def float_body(self, schema, src, dst, indent):
+        params = schema.params
+        min_value = float(params.get('min', -sys.float_info.max))
+        max_value = float(params.get('max', sys.float_info.max))
+        exmin = params.get('exmin', False)
+        exmax = params.get('exmax', False)
+        if _is_number(exmin):
+            min_value = float(exmin)
+            exmin = True
+        if _is_number(exmax):
+            max_value = float(exmax)
+            exmax = True
+        self.emit(indent, 'try:')
+        self.emit(indent + 1, '{} = float({})'.format(dst, src))
+        self.emit(indent, 'except Exception:')
+        self.fail(indent + 1, 'invalid float', from_none=True)
+        if exmin:
+            op, msg = '<=', 'value must > %d' % min_value
+        else:
+            op, msg = '<', 'value must >= %d' % min_value
+        self.emit(indent, 'if {} {} {}:'.format(dst, op, self.number(min_value)))
+        self.fail(indent + 1, msg)
+        if exmax:
+            op, msg = '>=', 'value must < %d' % max_value
+        else:
+            op, msg = '>', 'value must <= %d' % max_value
+        self.emit(indent, 'if {} {} {}:'.format(dst, op, self.number(max_value)))
+        self.fail(indent + 1, msg)
+        return False
+
+    def str_body(self, schema, src, dst, indent):
+        minlen = schema.params.get('minlen', 0)
+        maxlen = schema.params.get('maxlen', 1024 * 1024)
+        n = self.name('n')
+        self.emit(indent, '{} = {}'.format(dst, src))
+        self.emit(indent, 'if not isinstance({}, str):'.format(dst))
+        self.emit(indent + 1, 'if isinstance({}, int):'.format(dst))
+        self.emit(indent + 2, '{r} = str({r})'.format(r=dst))
+        self.emit(indent + 1, 'else:')
+        self.fail(indent + 2, 'invalid string')
+        if schema.params.get('strip'):
+            self.emit(indent, '{r} = {r}.strip()'.format(r=dst))
+        self.emit(indent, '{} = len({})'.format(n, dst))
+        if minlen > 0:
+            self.emit(indent, 'if {} < {}:'.format(n, minlen))
+            self.fail(indent + 1, 'string length must >= %d' % minlen)
+        self.emit(indent, 'if {} > {}:'.format(n, maxlen))
+        self.fail(indent + 1, 'string length must <= %d' % maxlen)
+        return True
+
+    def generate(self, schema, func_name='validate'):
+        self.emit(0, 'def {}(value):'.format(func_name))
+        self.node(schema, 'value', 'result', 1)
+        if self.result:
+            self.emit(1, 'return result, None')
+        else:
+            self.emit(1, 'return result')
+        return '\n'.join(self.lines) + '\n'
+
+
+def compile_codegen(compiler, schema, result=False):
+    """Compile schema to one flat python function
+
+    Args:
+        compiler: the closure backend compiler
+        schema (Schema): the schema
+        result (bool): generate function which return (value, error)
+    """
+    # compile by closure backend first, it reports schema errors
+    # and is the fallback of schemas which can not be inlined
+    origin = compiler.compile(schema)
+    codegen = _CodeGen(compiler, result=result)
+    if not result and not codegen.can_inline(schema):
+        return origin
+    source = codegen.generate(schema)
+    filename = '<validr codegen {}>'.format(origin.__name__)
+    namespace = codegen.namespace
+    exec(compile(source, filename, 'exec'), namespace)
+    validate = namespace['validate']
+    validate.__schema__ = origin.__schema__
+    validate.__module__ = origin.__module__
+    validate.__name__ = origin.__name__
+    validate.__qualname__ = getattr(origin, '__qualname__', origin.__name__)
+    validate.__doc__ = origin.__doc__
+    validate.__source__ = source
+    return validate
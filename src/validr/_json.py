@@ -0,0 +1,203 @@
+"""
+Validate JSON while decoding
+
+List schemas are decoded item by item, each item is decoded by the
+scanner of stdlib json module and validated before decode the next item,
+so an oversized list is rejected early and the raw items are not kept.
+Dict schemas which contain such list schemas are decoded key by key,
+unknown keys are skipped. Other values are decoded by the scanner then
+validated by the compiled validator.
+
+The accepted values and outputs are the same as `json.loads` then
+validate, except errors are reported in order of the JSON document and
+an invalid value of duplicate key is rejected even it's overridden later.
+"""
+import json
+from json.decoder import WHITESPACE, JSONDecodeError, scanstring
+
+from .validator import Invalid, ValidrError, _key_func_of_schema, builtin_validators
+
+_decoder = json.JSONDecoder()
+_scan_once = _decoder.scan_once
+_skip_whitespace = WHITESPACE.match
+
+# params which can be checked when decode dict or list item by item
+_DICT_PARAMS = {'optional', 'desc', 'slim', 'minlen', 'maxlen'}
+_LIST_PARAMS = {'optional', 'desc', 'minlen', 'maxlen', 'unique'}
+
+
+def _skip(s, idx):
+    return _skip_whitespace(s, idx).end()
+
+
+def _is_builtin(compiler, schema, name, params):
+    if schema.validator != name or schema.items is None:
+        return False
+    if compiler.validators.get(name) is not builtin_validators[name]:
+        return False
+    return set(schema.params) <= params
+
+
+def _scan_value(s, idx):
+    try:
+        return _scan_once(s, idx)
+    except StopIteration as ex:
+        raise JSONDecodeError('Expecting value', s, ex.value) from None
+
+
+def _leaf_parser(validate):
+    def parse(s, idx):
+        value, end = _scan_value(s, idx)
+        return validate(value), end
+    parse.validate = validate
+    parse.is_leaf = True
+    return parse
+
+
+def _list_parser(compiler, schema, validate):
+    parse_item = _leaf_parser(compiler.compile(schema.items))
+    minlen = schema.params.get('minlen', 0)
+    maxlen = schema.params.get('maxlen', 1024)
+    unique = schema.params.get('unique', False)
+    if unique:
+        key_of = _key_func_of_schema(schema.items)
+    fallback = _leaf_parser(validate)
+
+    def parse(s, idx):
+        if s[idx:idx + 1] != '[':
+            return fallback(s, idx)
+        result = []
+        if unique:
+            keys = set()
+        idx = _skip(s, idx + 1)
+        i = 0
+        if s[idx:idx + 1] != ']':
+            while True:
+                if i >= maxlen:
+                    raise Invalid('list length must <= %d' % maxlen)
+                try:
+                    value, idx = parse_item(s, idx)
+                    if unique:
+                        k = key_of(value)
+                        if k in keys:
+                            raise Invalid('not unique')
+                        keys.add(k)
+                except ValidrError as ex:
+                    ex.mark_index(i)
+                    raise
+                result.append(value)
+                i += 1
+                idx = _skip(s, idx)
+                c = s[idx:idx + 1]
+                if c == ']':
+                    break
+                if c != ',':
+                    raise JSONDecodeError("Expecting ',' delimiter", s, idx)
+                idx = _skip(s, idx + 1)
+        if minlen > 0 and i < minlen:
+            raise Invalid('list length must >= %d' % minlen)
+        return result, idx + 1
+
+    parse.validate = validate
+    parse.is_leaf = False
+    return parse
+
+
+def _dict_parser(schema, validate, parsers):
+    slim = schema.params.get('slim', False)
+    missing = [(k, parsers[k].validate) for k in schema.items]
+    fallback = _leaf_parser(validate)
+
+    def parse(s, idx):
+        if s[idx:idx + 1] != '{':
+            return fallback(s, idx)
+        values = {}
+        idx = _skip(s, idx + 1)
+        if s[idx:idx + 1] != '}':
+            while True:
+                if s[idx:idx + 1] != '"':
+                    raise JSONDecodeError(
+                        'Expecting property name enclosed in double quotes', s, idx)
+                key, idx = scanstring(s, idx + 1)
+                idx = _skip(s, idx)
+                if s[idx:idx + 1] != ':':
+                    raise JSONDecodeError("Expecting ':' delimiter", s, idx)
+                idx = _skip(s, idx + 1)
+                parse_value = parsers.get(key)
+                if parse_value is None:
+                    _, idx = _scan_value(s, idx)
+                else:
+                    try:
+                        values[key], idx = parse_value(s, idx)
+                    except ValidrError as ex:
+                        ex.mark_key(key)
+                        raise
+                idx = _skip(s, idx)
+                c = s[idx:idx + 1]
+                if c == '}':
+                    break
+                if c != ',':
+                    raise JSONDecodeError("Expecting ',' delimiter", s, idx)
+                idx = _skip(s, idx + 1)
+        result = {}
+        for k, validate_missing in missing:
+            if k in values:
+                result[k] = values[k]
+                continue
+            try:
+                result[k] = validate_missing(None)
+            except ValidrError as ex:
+                ex.mark_key(k)
+                raise
+        if slim:
+            result = {k: v for k, v in result.items() if v is not None and v != ''}
+        return result, idx + 1
+
+    parse.validate = validate
+    parse.is_leaf = False
+    return parse
+
+
+def _parser(compiler, schema):
+    validate = compiler.compile(schema)
+    if _is_builtin(compiler, schema, 'list', _LIST_PARAMS):
+        return _list_parser(compiler, schema, validate)
+    if _is_builtin(compiler, schema, 'dict', _DICT_PARAMS):
+        parsers = {}
+        for k, v in schema.items.items():
+            try:
+                parsers[k] = _parser(compiler, v)
+            except ValidrError as ex:
+                ex.mark_key(k)
+                raise
+        # decode key by key only if some value decoded item by item
+        if not all(x.is_leaf for x in parsers.values()):
+            return _dict_parser(schema, validate, parsers)
+    return _leaf_parser(validate)
+
+
+def compile_json(compiler, schema):
+    """Compile schema to function which decode and validate JSON"""
+    parse = _parser(compiler, schema)
+
+    def validate_json(data):
+        if hasattr(data, 'read'):
+            data = data.read()
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode(json.detect_encoding(data), 'surrogatepass')
+        elif not isinstance(data, str):
+            raise TypeError('the JSON object must be str, bytes or bytearray, '
+                            'not {}'.format(type(data).__name__))
+        try:
+            if data.startswith('\ufeff'):
+                raise JSONDecodeError('Unexpected UTF-8 BOM', data, 0)
+            value, end = parse(data, _skip(data, 0))
+            end = _skip(data, end)
+            if end != len(data):
+                raise JSONDecodeError('Extra data', data, end)
+        except JSONDecodeError as ex:
+            raise Invalid('invalid json, {}'.format(ex)) from None
+        return value
+
+    validate_json.__schema__ = schema
+    return validate_json
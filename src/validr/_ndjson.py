@@ -0,0 +1,145 @@
+"""
+Validate JSON Lines files in process pool
+
+The file is mmaped and split into chunks on newline boundaries, only the
+offsets of chunks are sent to workers. Each worker mmap the file once,
+decode and validate lines of its chunks, and send back the valid records
+already encoded as JSON lines and the errors of invalid lines, so the
+records are not pickled between processes. Results are written in order
+of the file.
+"""
+import collections
+import concurrent.futures
+import json
+import mmap
+import os
+
+NDJSONResult = collections.namedtuple('NDJSONResult', 'lines valid invalid')
+
+# chunk validator of current worker process
+_worker = None
+
+
+class _ChunkValidator:
+
+    def __init__(self, compiler, schema, path, dump_valid):
+        self.validate = compiler.compile_result(schema)
+        self.path = path
+        self.dump_valid = dump_valid
+        self._mmap = None
+
+    def _get_mmap(self):
+        if self._mmap is None:
+            with open(self.path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __call__(self, start, end):
+        validate = self.validate
+        dump_valid = self.dump_valid
+        lines = self._get_mmap()[start:end].split(b'\n')
+        if not lines[-1]:
+            lines.pop()
+        records = []
+        errors = []
+        num_valid = 0
+        for lineno, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                value = json.loads(line)
+            except ValueError as ex:
+                errors.append((lineno, None, 'invalid json, {}'.format(ex)))
+                continue
+            value, error = validate(value)
+            if error is not None:
+                errors.append((lineno, error.position, error.message))
+                continue
+            num_valid += 1
+            if dump_valid:
+                records.append(json.dumps(value, ensure_ascii=False, default=str))
+        if records:
+            records.append('')
+        return len(lines), num_valid, '\n'.join(records).encode('utf-8'), errors
+
+
+def _init_worker(compiler, schema, path, dump_valid):
+    global _worker
+    _worker = _ChunkValidator(compiler, schema, path, dump_valid)
+
+
+def _validate_chunk(start, end):
+    return _worker(start, end)
+
+
+def _iter_chunks(path, chunksize):
+    """Split file into (start, end) offsets on newline boundaries"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            start = 0
+            while start < size:
+                newline = m.find(b'\n', min(start + chunksize, size) - 1)
+                end = size if newline < 0 else newline + 1
+                yield start, end
+                start = end
+
+
+def _iter_results(compiler, schema, path, dump_valid, workers, chunksize):
+    chunks = _iter_chunks(path, chunksize)
+    if workers <= 1:
+        validate_chunk = _ChunkValidator(compiler, schema, path, dump_valid)
+        try:
+            for start, end in chunks:
+                yield validate_chunk(start, end)
+        finally:
+            validate_chunk.close()
+        return
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(compiler, schema, path, dump_valid),
+    )
+    # limit pending tasks, avoid hold results of whole file in memory
+    max_pending = workers * 2
+    pending = collections.deque()
+    try:
+        for start, end in chunks:
+            pending.append(executor.submit(_validate_chunk, start, end))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        for future in pending:
+            yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def validate_ndjson(compiler, schema, path, output=None, errors=None, *,
+                    workers=None, chunksize=16 * 1024 * 1024):
+    """Validate JSON Lines file, see Compiler.validate_ndjson"""
+    if chunksize <= 0:
+        raise ValueError('chunksize must > 0')
+    # compile in current process first, it reports schema errors
+    compiler.compile_result(schema)
+    workers = workers or os.cpu_count() or 1
+    results = _iter_results(
+        compiler, schema, os.fspath(path), output is not None, workers, chunksize)
+    num_lines = num_valid = num_invalid = 0
+    for chunk_lines, chunk_valid, records, chunk_errors in results:
+        if output is not None and records:
+            output.write(records)
+        if errors is not None:
+            for lineno, position, message in chunk_errors:
+                report = dict(line=num_lines + lineno, position=position, message=message)
+                errors.write(json.dumps(report, ensure_ascii=False).encode('utf-8') + b'\n')
+        num_lines += chunk_lines
+        num_valid += chunk_valid
+        num_invalid += len(chunk_errors)
+    return NDJSONResult(lines=num_lines, valid=num_valid, invalid=num_invalid)
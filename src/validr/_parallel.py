@@ -0,0 +1,80 @@
+"""
+Validate large batches in process pool
+
+Compiled validators are closures and can not be pickled, so the compiler
+and schema are sent to workers, each worker compile the schema once and
+validate chunks of values by the result mode validator.
+"""
+import collections
+import concurrent.futures
+import itertools
+import os
+
+# validate function of current worker process
+_worker_validate = None
+
+
+def _init_worker(compiler, schema):
+    global _worker_validate
+    _worker_validate = compiler.compile_result(schema)
+
+
+def _validate_chunk(start, values):
+    validate = _worker_validate
+    results = []
+    for index, value in enumerate(values, start):
+        value, error = validate(value)
+        results.append((index, value if error is None else error))
+    return results
+
+
+def _iter_chunks(values, chunksize):
+    values = iter(values)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(values, chunksize))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def validate_parallel(compiler, schema, values, *,
+                      workers=None, chunksize=1000, ordered=True):
+    """Validate values in process pool, see Compiler.validate_parallel"""
+    if chunksize <= 0:
+        raise ValueError('chunksize must > 0')
+    # compile in current process first, it reports schema errors
+    compiler.compile_result(schema)
+    workers = workers or os.cpu_count() or 1
+    return _iter_results(compiler, schema, values, workers, chunksize, ordered)
+
+
+def _iter_results(compiler, schema, values, workers, chunksize, ordered):
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(compiler, schema),
+    )
+    # limit pending tasks, avoid load all values into memory
+    max_pending = workers * 2
+    pending = collections.deque()
+    try:
+        for start, chunk in _iter_chunks(values, chunksize):
+            pending.append(executor.submit(_validate_chunk, start, chunk))
+            if len(pending) < max_pending:
+                continue
+            if ordered:
+                yield from pending.popleft().result()
+            else:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    yield from future.result()
+        if not ordered:
+            pending = concurrent.futures.as_completed(pending)
+        for future in pending:
+            yield from future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
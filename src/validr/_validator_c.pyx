@@ -1,12 +1,18 @@
 import re
 import sys
+import threading
+import _strptime
 import uuid
 import time
 import datetime
 import ipaddress
 import typing
+from array import array as _array
+from collections import namedtuple
+from keyword import iskeyword
 from copy import copy
-from functools import partial
+from operator import attrgetter, itemgetter, methodcaller
+from functools import lru_cache, partial
 from urllib.parse import urlparse, urlunparse
 
 from ._vendor import durationpy
@@ -193,18 +199,70 @@ class py_mark_index(mark_index): pass
 class py_mark_key(mark_key): pass
 
 
+# is_dict results of types, only types which not customize attribute
+# access are cached, the cache size is limited for dynamic created types
+cdef dict _IS_DICT_TYPES = {dict: True}
+cdef int _IS_DICT_TYPES_MAXSIZE = 1024
+
+
 cdef bint is_dict(obj):
+    tp = type(obj)
+    cached = _IS_DICT_TYPES.get(tp)
+    if cached is not None:
+        return cached
     # use isinstance(obj, Mapping) is slow,
     # hasattr check can speed up about 30%
-    return hasattr(obj, '__getitem__') and hasattr(obj, 'get')
+    if tp.__getattribute__ is not object.__getattribute__ or hasattr(tp, '__getattr__'):
+        return hasattr(obj, '__getitem__') and hasattr(obj, 'get')
+    # check the type, so results of first and later calls are the same
+    cdef bint result = hasattr(tp, '__getitem__') and hasattr(tp, 'get')
+    if len(_IS_DICT_TYPES) < _IS_DICT_TYPES_MAXSIZE:
+        _IS_DICT_TYPES[tp] = result
+    return result
+
+
+cdef int _VALUE_DICT = 0     # exact dict, get values by dict.get
+cdef int _VALUE_MAPPING = 1  # dict-like object, get values by obj.get
+cdef int _VALUE_OBJECT = 2   # other object, get values by getattr
+
 
+cdef int _value_kind(value):
+    if type(value) is dict:
+        return _VALUE_DICT
+    if is_dict(value):
+        return _VALUE_MAPPING
+    return _VALUE_OBJECT
 
-cdef inline get_dict_value(obj, str key):
-    return obj.get(key, None)
 
+cdef _get_value(value, str key):
+    if _value_kind(value) == _VALUE_OBJECT:
+        return getattr(value, key, None)
+    return value.get(key, None)
 
-cdef inline get_object_value(obj, str key):
-    return getattr(obj, key, None)
+
+cdef _attrs_getter(list keys):
+    """Create getter which get attributes of keys by one call, None if
+    the keys can not be get by attrgetter"""
+    cdef str k
+    if len(keys) < 2:
+        return None
+    for k in keys:
+        # attrgetter treat dotted names as nested attributes
+        if '.' in k:
+            return None
+    return attrgetter(*keys)
+
+
+cdef _get_values(value, int kind, list keys, attrs):
+    """Get values of keys from dict-like object or object, None if absent"""
+    if kind != _VALUE_OBJECT:
+        return [value.get(k, None) for k in keys]
+    if attrs is not None:
+        try:
+            return attrs(value)
+        except AttributeError:
+            pass
+    return [getattr(value, k, None) for k in keys]
 
 
 cdef inline bint _is_empty(value):
@@ -266,6 +324,57 @@ def _update_validate_func_type_hints(
     validate_func.__annotations__ = annotations
 
 
+cdef _reuse_string_validate(validate):
+    """Return input string as is if it's already in output format"""
+
+    def reuse_validate(value):
+        result = validate(value)
+        if result is not value and type(value) is str and result == value:
+            return value
+        return result
+
+    return reuse_validate
+
+
+cdef _cached_validate(validate, int maxsize):
+    """Cache results and errors of string values by LRU cache, other values
+    are not cached because equal values may have different results,
+    eg: aware datetimes of different offsets, 0.0 and -0.0"""
+
+    @lru_cache(maxsize=maxsize)
+    def cached(value):
+        try:
+            return True, validate(value)
+        except Invalid as ex:
+            # not keep traceback of the error
+            return False, (ex.args, ex._value)
+
+    def cached_validate(value):
+        if type(value) is not str:
+            return validate(value)
+        ok, result = cached(value)
+        if ok:
+            return result
+        args, error_value = result
+        raise Invalid(*args, value=error_value)
+
+    cached_validate.cache_info = cached.cache_info
+    cached_validate.cache_clear = cached.cache_clear
+    return cached_validate
+
+
+# cached results are shared, not allowed cache for these outputs
+_MUTABLE_OUTPUTS = {(typing.List,), (dict,)}
+
+
+# null, default and optional handling of validate func, it's used by the
+# codegen compile backend to inline them
+_ValidateSpec = namedtuple('_ValidateSpec', [
+    'validate', 'accept_string', 'accept_object', 'null_output',
+    'optional', 'has_default', 'default', 'supress_invalid', 'invalid_to',
+])
+
+
 def validator(string=None, *, accept=None, output=None):
     """Decorator for create validator
 
@@ -353,10 +462,23 @@ def validator(string=None, *, accept=None, output=None):
                 raise SchemaError('can not set both invalid_to and invalid_to_default')
             if invalid_to_default and (not has_default) and (not optional):
                 raise SchemaError('default or optional must be set when set invalid_to_default')
+            cache_size = params.pop('cache', 0)
+            if isinstance(cache_size, bool):
+                raise SchemaError('cache size required, eg: cache(1024)')
+            if not isinstance(cache_size, int) or cache_size < 0:
+                raise SchemaError('cache size must be non-negative int')
+            if cache_size and output_hints in _MUTABLE_OUTPUTS:
+                raise SchemaError('not allowed cache for mutable output')
             try:
                 validate = f(compiler, **params)
             except TypeError as e:
                 raise SchemaError(str(e)) from None
+            cached_validate = None
+            if cache_size:
+                validate = cached_validate = _cached_validate(validate, cache_size)
+            if getattr(compiler, 'reuse', False):
+                if not local_output_object and schema.validator != 'str':
+                    validate = _reuse_string_validate(validate)
             # check default value
             if has_default:
                 try:
@@ -421,6 +543,12 @@ def validator(string=None, *, accept=None, output=None):
                         raise
 
             _update_validate_func_info(m_validate, f, schema)
+            if cached_validate is not None:
+                m_validate.cache_info = cached_validate.cache_info
+                m_validate.cache_clear = cached_validate.cache_clear
+            m_validate.__validate_spec__ = _ValidateSpec(
+                validate, accept_string, accept_object, null_output,
+                optional, has_default, default, supress_invalid, invalid_to)
 
             # _update_validate_func_type_hints(
             #     m_validate, optional=optional, has_default=has_default,
@@ -489,24 +617,204 @@ def _key_func_of_schema(schema):
     return key_of
 
 
+# formats of 1-D buffers which bounds can be checked in bulk,
+# eg: array.array and numpy array of native byte order
+_NUMERIC_FORMATS = frozenset('bBhHiIlLqQfd')
+_INT_FORMATS = frozenset('bBhHiIlLqQ')
+# formats which can be copied to the output array as bytes
+_SAME_FORMATS = {
+    'd': frozenset('d'),
+    'q': frozenset(x for x in 'lq' if _array(x).itemsize == 8),
+}
+
+
+cdef _numeric_view(value):
+    """Get memoryview of 1-D numeric buffer, return None if not"""
+    if type(value) is list or type(value) is tuple or isinstance(value, str):
+        return None
+    try:
+        view = memoryview(value)
+    except TypeError:
+        return None
+    if view.ndim == 1 and view.format in _NUMERIC_FORMATS:
+        return view
+    view.release()
+    return None
+
+
+cdef _array_bounds(compiler, items):
+    """Get typecode and bounds of typed array of items schema"""
+    if items is None or items.validator not in ('int', 'float'):
+        raise SchemaError('array output requires int or float items')
+    if compiler.validators.get(items.validator) is not builtin_validators[items.validator]:
+        raise SchemaError('array output requires int or float items')
+    if items.params.get('optional'):
+        with mark_index():
+            raise SchemaError('optional items not allowed for array output')
+    params = items.params
+    if items.validator == 'int':
+        return 'q', (int(params.get('min', -MAX_INT)), int(params.get('max', MAX_INT)), False, False)
+    bounds = _float_bounds(
+        params.get('min', -sys.float_info.max), params.get('max', sys.float_info.max),
+        params.get('exmin', False), params.get('exmax', False))
+    return 'd', bounds
+
+
+cdef _array_validator(validate_list, str typecode, bounds, int minlen, int maxlen, bint unique, bint reuse):
+    min_value, max_value, exmin, exmax = bounds
+    formats = _NUMERIC_FORMATS if typecode == 'd' else _INT_FORMATS
+    same_formats = _SAME_FORMATS[typecode]
+
+    def pack(values):
+        try:
+            return _array(typecode, values)
+        except OverflowError:
+            pass
+        for i, v in enumerate(values):
+            try:
+                _array(typecode, (v,))
+            except OverflowError:
+                raise Invalid('value out of range of array', value=v).mark_index(i) from None
+
+    def check_bulk(value, view):
+        """Check numeric buffer without validate items one by one,
+        return False if some item may be invalid"""
+        if view.format not in formats:
+            return False
+        cdef int n = len(view)
+        if n > maxlen or n < minlen:
+            return False
+        if n == 0:
+            return True
+        if hasattr(value, 'dtype'):
+            # numpy array, its min and max are vectorized
+            lo, hi = value.min(), value.max()
+        else:
+            lo, hi = min(view), max(view)
+        # NaN, let items report
+        if lo != lo or hi != hi:
+            return False
+        if exmin:
+            if lo <= min_value:
+                return False
+        else:
+            if lo < min_value:
+                return False
+        if exmax:
+            if hi >= max_value:
+                return False
+        else:
+            if hi > max_value:
+                return False
+        if unique and len(set(view)) != n:
+            return False
+        return True
+
+    def validate_bulk(value, view):
+        if not check_bulk(value, view):
+            return None
+        if reuse and type(value) is _array and value.typecode == typecode:
+            return value
+        if view.c_contiguous and view.format in same_formats:
+            result = _array(typecode)
+            result.frombytes(view.cast('B'))
+            return result
+        try:
+            return _array(typecode, view)
+        except OverflowError:
+            return None
+
+    def validate(value):
+        view = _numeric_view(value)
+        if view is not None:
+            try:
+                result = validate_bulk(value, view)
+            finally:
+                view.release()
+            if result is not None:
+                return result
+        return pack(validate_list(value))
+    return validate
+
+
 @validator(accept=typing.Iterable, output=typing.List)
 def list_validator(compiler, items=None, int minlen=0, int maxlen=1024,
-                   bint unique=False):
+                   bint unique=False, bint array=False):
+    cdef bint reuse
+    reuse = getattr(compiler, 'reuse', False)
     if items is None:
-        inner = None
+        inner = _reuse_validate if reuse else None
     else:
         with mark_index():
             inner = compiler.compile(items)
     if unique:
         key_of = _key_func_of_schema(items)
+    if array:
+        typecode, bounds = _array_bounds(compiler, items)
+    cdef bint track_position
+    track_position = getattr(compiler, 'track_position', True)
     del compiler, items
 
     def validate(value):
+        # reuse the input list until some item changed
+        cdef bint same
+        same = reuse and type(value) is list
+        origin = value
         try:
             value = enumerate(value)
         except TypeError:
             raise Invalid('not list')
         result = []
+        if unique:
+            keys = set()
+        cdef int i = -1
+        for i, x in value:
+            if i >= maxlen:
+                raise Invalid('list length must <= %d' % maxlen)
+            if not track_position:
+                try:
+                    v = inner(x) if inner is not None else copy(x)
+                except ValidrError as ex:
+                    ex.mark_index(i)
+                    raise
+            else:
+                with mark_index(i):
+                    v = inner(x) if inner is not None else copy(x)
+            if unique:
+                with mark_index(i):
+                    k = key_of(v)
+                    if k in keys:
+                        raise Invalid('not unique')
+                keys.add(k)
+            if same:
+                if v is x:
+                    continue
+                same = False
+                result = origin[:i]
+            result.append(v)
+        if minlen > 0 and i + 1 < minlen:
+            raise Invalid('list length must >= %d' % minlen)
+        if same:
+            return origin
+        return result
+    if array:
+        return _array_validator(validate, typecode, bounds, minlen, maxlen, unique, reuse)
+    return validate
+
+
+def py_list_stream(compiler, items=None, int minlen=0, int maxlen=1024,
+                   bint unique=False, bint optional=False):
+    """Create function which validate items of iterable lazily"""
+    if items is None:
+        inner = None
+    else:
+        with mark_index():
+            inner = compiler.compile(items)
+    if unique:
+        key_of = _key_func_of_schema(items)
+    del compiler, items
+
+    def stream(value):
         if unique:
             keys = set()
         cdef int i = -1
@@ -515,15 +823,98 @@ def list_validator(compiler, items=None, int minlen=0, int maxlen=1024,
                 raise Invalid('list length must <= %d' % maxlen)
             with mark_index(i):
                 v = inner(x) if inner is not None else copy(x)
-                if unique:
+            if unique:
+                with mark_index(i):
                     k = key_of(v)
                     if k in keys:
                         raise Invalid('not unique')
-                    keys.add(k)
-            result.append(v)
+                keys.add(k)
+            yield v
         if minlen > 0 and i + 1 < minlen:
             raise Invalid('list length must >= %d' % minlen)
+
+    def validate_stream(value):
+        if value is None:
+            if optional:
+                return iter(())
+            raise Invalid('required')
+        try:
+            value = enumerate(value)
+        except TypeError:
+            raise Invalid('not list')
+        return stream(value)
+
+    return validate_stream
+
+
+def py_row_validator(compiler, items, columns=None, bint output_tuple=False,
+                     bint optional=False, bint slim=False):
+    """Create function which validate row of columns by position
+
+    Args:
+        items (dict): schemas of fields
+        columns (list): column names of row, default names of fields
+        output_tuple (bool): return tuple of fields instead of dict
+    """
+    if columns is None:
+        columns = list(items)
+    cdef dict index_of = {}
+    cdef int i
+    for i, name in enumerate(columns):
+        if name in index_of and name in items:
+            raise SchemaError('duplicate column {!r}'.format(name))
+        index_of[name] = i
+    fields = []
+    for k, v in items.items():
+        with mark_key(k):
+            fields.append((k, index_of.get(k, -1), compiler.compile(v)))
+    cdef int size = max([i + 1 for _, i, _ in fields], default=0)
+    cdef bint track_position
+    track_position = getattr(compiler, 'track_position', True)
+    del compiler, items, columns, index_of
+
+    def validate(row):
+        if row is None:
+            if optional:
+                return None
+            raise Invalid('required')
+        if type(row) is not tuple and type(row) is not list:
+            if isinstance(row, (str, bytes, dict)):
+                raise Invalid('not row', value=row)
+            try:
+                row = tuple(row)
+            except TypeError:
+                raise Invalid('not row', value=row) from None
+        if len(row) < size:
+            # absent columns are None
+            row = tuple(row) + (None,) * (size - len(row))
+        cdef str k
+        cdef int i
+        if output_tuple:
+            values = []
+        else:
+            result = {}
+        for k, i, inner in fields:
+            x = row[i] if i >= 0 else None
+            if not track_position:
+                try:
+                    v = inner(x)
+                except ValidrError as ex:
+                    ex.mark_key(k)
+                    raise
+            else:
+                with mark_key(k):
+                    v = inner(x)
+            if output_tuple:
+                values.append(v)
+            else:
+                result[k] = v
+        if output_tuple:
+            return tuple(values)
+        if slim:
+            result = _slim_dict(result)
         return result
+
     return validate
 
 
@@ -531,9 +922,98 @@ cdef inline dict _slim_dict(dict value):
     return {k: v for k, v in value.items() if not _is_empty(v)}
 
 
+cdef inline bint _has_empty(dict value):
+    for v in value.values():
+        if _is_empty(v):
+            return True
+    return False
+
+
+cdef _compile_sparse(list inners):
+    """Precompute outputs of absent keys, validators which handle None by
+    the validator decorator always give the same output for None"""
+    cdef dict absent = {}
+    cdef dict validators = {}
+    cdef list required = []
+    cdef list others = []
+    cdef str k
+    cdef int i
+    for i, (k, inner) in enumerate(inners):
+        # the index keeps errors in order of schema
+        validators[k] = (i, inner)
+        absent[k] = None
+        if getattr(inner, '__validate_spec__', None) is None:
+            others.append((i, k))
+            continue
+        try:
+            absent[k] = inner(None)
+        except ValidrError:
+            required.append(k)
+    return absent, validators, required, others
+
+
+cdef _validate_sparse(dict value, sparse, bint track_position):
+    """Validate only keys present in value, return None if some required
+    key is absent"""
+    cdef dict absent
+    cdef dict validators
+    cdef list required
+    cdef list others
+    absent, validators, required, others = sparse
+    for k in required:
+        if k not in value:
+            return None
+    cdef list todo = []
+    for k, x in value.items():
+        spec = validators.get(k)
+        if spec is not None:
+            todo.append((spec[0], k, x))
+    for i, k in others:
+        if k not in value:
+            todo.append((i, k, None))
+    todo.sort(key=itemgetter(0))
+    cdef dict result = absent.copy()
+    if not track_position:
+        try:
+            for i, k, x in todo:
+                result[k] = validators[k][1](x)
+        except ValidrError as ex:
+            ex.mark_key(k)
+            raise
+    else:
+        for i, k, x in todo:
+            with mark_key(k):
+                result[k] = validators[k][1](x)
+    return result
+
+
+def _restore_record(fields, values):
+    return _record_class(fields)._make(values)
+
+
+def _record_reduce(self):
+    return (_restore_record, (self._fields, tuple(self)))
+
+
+_tuple_new = tuple.__new__
+
+
+@lru_cache(maxsize=1024)
+def _record_class(fields):
+    """Create namedtuple class of fields, it's shared by schemas which
+    have same fields, records are pickled by fields and values"""
+    for k in fields:
+        if not k.isidentifier() or iskeyword(k) or k.startswith('_'):
+            raise SchemaError('invalid record field name {!r}'.format(k))
+    record_class = namedtuple('Record', fields)
+    record_class.__reduce__ = _record_reduce
+    return record_class
+
+
 @validator(accept=(typing.Mapping, typing.Any), output=dict)
 def dict_validator(compiler, items=None, key=None, value=None,
-                   int minlen=0, int maxlen=1024, bint slim=False):
+                   int minlen=0, int maxlen=1024, bint slim=False,
+                   bint record=False):
     if items is None:
         inners = None
     else:
@@ -550,6 +1030,27 @@ def dict_validator(compiler, items=None, key=None, value=None,
             validate_extra_value = compiler.compile(value)
     cdef bint is_dynamic
     is_dynamic = bool(validate_extra_key or validate_extra_value)
+    cdef bint track_position
+    track_position = getattr(compiler, 'track_position', True)
+    cdef bint reuse
+    reuse = getattr(compiler, 'reuse', False)
+    # validate only present keys if the input is small compared to schema
+    sparse = None
+    if inners is not None and not is_dynamic:
+        sparse = _compile_sparse(inners)
+    keys = attrs = None
+    if inners is not None:
+        keys = [k for k, _ in inners]
+        attrs = _attrs_getter(keys)
+    # output namedtuple of fields instead of dict
+    record_class = None
+    if record:
+        if inners is None or is_dynamic:
+            raise SchemaError('record require dict schema with items')
+        if slim:
+            raise SchemaError('not allowed slim for record')
+        record_class = _record_class(tuple(keys))
+        sparse = None
     del compiler, items, key, value
 
     def validate(value):
@@ -560,26 +1061,38 @@ def dict_validator(compiler, items=None, key=None, value=None,
                 raise Invalid('dict length must <= %d' % maxlen)
             elif minlen > 0 and len(value) < minlen:
                 raise Invalid('dict length must >= %d' % minlen)
+            if reuse and type(value) is dict:
+                if not (slim and _has_empty(value)):
+                    return value
             if slim:
                 value = _slim_dict(value)
             return copy(value)
-        if is_dict(value):
-            getter = get_dict_value
+        cdef int kind = _value_kind(value)
+        if kind != _VALUE_OBJECT:
             if is_dynamic:
                 if len(value) > maxlen:
                     raise Invalid('dict length must <= %d' % maxlen)
                 elif minlen > 0 and len(value) < minlen:
                     raise Invalid('dict length must >= %d' % minlen)
         else:
-            getter = get_object_value
             if is_dynamic:
                 raise Invalid("dynamic dict not allowed non-dict value")
-        result = {}
         cdef str k
+        if record_class is not None:
+            return _validate_record(record_class, inners, keys, attrs, value, kind, track_position)
+        if reuse and not is_dynamic and kind == _VALUE_DICT:
+            if len(value) == len(inners):
+                return _reuse_dict(value, inners, track_position, slim)
+        if sparse is not None and kind == _VALUE_DICT:
+            if len(value) * 2 < len(inners):
+                sparse_result = _validate_sparse(value, sparse, track_position)
+                if sparse_result is not None:
+                    if slim:
+                        sparse_result = _slim_dict(sparse_result)
+                    return sparse_result
+        result = {}
         if inners is not None:
-            for k, inner in inners:
-                with mark_key(k):
-                    result[k] = inner(getter(value, k))
+            _validate_fields(result, inners, keys, attrs, value, kind, track_position)
         if is_dynamic:
             extra_keys = map(str, set(value) - set(result))
             for k in extra_keys:
@@ -587,9 +1100,11 @@ def dict_validator(compiler, items=None, key=None, value=None,
                     with mark_key('$self_key'):
                         k = str(validate_extra_key(k))
                 with mark_key(k):
-                    v = getter(value, k)
+                    v = value.get(k, None)
                     if validate_extra_value is not None:
                         result[k] = validate_extra_value(v)
+                    elif reuse:
+                        result[k] = v
                     else:
                         result[k] = copy(v)
         if slim:
@@ -598,12 +1113,115 @@ def dict_validator(compiler, items=None, key=None, value=None,
     return validate
 
 
+cdef _validate_fields(dict result, list inners, list keys, attrs, value, int kind, bint track_position):
+    cdef str k
+    cdef dict d
+    if kind == _VALUE_DICT:
+        d = value
+        if not track_position:
+            try:
+                for k, inner in inners:
+                    result[k] = inner(d.get(k))
+            except ValidrError as ex:
+                ex.mark_key(k)
+                raise
+        else:
+            for k, inner in inners:
+                with mark_key(k):
+                    result[k] = inner(d.get(k))
+        return
+    if kind == _VALUE_MAPPING:
+        if not track_position:
+            try:
+                for k, inner in inners:
+                    result[k] = inner(value.get(k, None))
+            except ValidrError as ex:
+                ex.mark_key(k)
+                raise
+        else:
+            for k, inner in inners:
+                with mark_key(k):
+                    result[k] = inner(value.get(k, None))
+        return
+    values = _get_values(value, kind, keys, attrs)
+    if not track_position:
+        try:
+            for (k, inner), x in zip(inners, values):
+                result[k] = inner(x)
+        except ValidrError as ex:
+            ex.mark_key(k)
+            raise
+    else:
+        for (k, inner), x in zip(inners, values):
+            with mark_key(k):
+                result[k] = inner(x)
+
+
+cdef _validate_record(record_class, list inners, list keys, attrs, value, int kind, bint track_position):
+    cdef str k
+    values = []
+    fields = _get_values(value, kind, keys, attrs)
+    if not track_position:
+        try:
+            for (k, inner), x in zip(inners, fields):
+                values.append(inner(x))
+        except ValidrError as ex:
+            ex.mark_key(k)
+            raise
+    else:
+        for (k, inner), x in zip(inners, fields):
+            with mark_key(k):
+                values.append(inner(x))
+    return _tuple_new(record_class, values)
+
+
+cdef _reuse_dict(dict value, list inners, bint track_position, bint slim):
+    """Validate dict which has same number of keys as schema, return it
+    as is if all keys are in schema and no value changed"""
+    cdef dict result = None
+    cdef str k
+    cdef int i
+    for i, (k, inner) in enumerate(inners):
+        x = value.get(k)
+        if not track_position:
+            try:
+                v = inner(x)
+            except ValidrError as ex:
+                ex.mark_key(k)
+                raise
+        else:
+            with mark_key(k):
+                v = inner(x)
+        if result is None:
+            if v is x and (x is not None or k in value):
+                continue
+            result = {key: value[key] for key, _ in inners[:i]}
+        result[k] = v
+    if result is None:
+        if slim and _has_empty(value):
+            return _slim_dict(value)
+        return value
+    if slim:
+        result = _slim_dict(result)
+    return result
+
+
 @validator(accept=(typing.Mapping, typing.Any), output=object)
 def model_validator(compiler, items=None):
     if items is None:
         raise SchemaError('model class not provided')
+    copy_validated = None
+    if hasattr(items, '__fields__'):
+        copy_validated = getattr(items, '_copy_validated', None)
 
     def validate(value):
+        # instances of the model class are already validated
+        if copy_validated is not None and type(value) is items:
+            if value.__immutable__:
+                return value
+            result = copy_validated(value)
+            if result is not None:
+                return result
         return items(value)
 
     return validate
@@ -728,13 +1346,9 @@ def _union_dict_validator(compiler, items, str by):
     del key, schema, is_model
 
     def validate(value):
-        if is_dict(value):
-            getter = get_dict_value
-        else:
-            getter = get_object_value
         cdef str by_name
         with mark_key(by):
-            by_name = getter(value, by)
+            by_name = _get_value(value, by)
             if not by_name:
                 raise Invalid('required', value=by_name)
             inner_info = inners.get(by_name)
@@ -754,9 +1368,15 @@ cdef any_validate(value):
     return copy(value)
 
 
+cdef _reuse_validate(value):
+    return value
+
+
 @validator(accept=object, output=object)
 def any_validator(compiler, **ignore_kwargs):
     """Accept any value"""
+    if getattr(compiler, 'reuse', False):
+        return _reuse_validate
     return any_validate
 
 
@@ -812,17 +1432,8 @@ def bool_validator(compiler):
     return validate
 
 
-@validator(accept=(int, float, str), output=float)
-def float_validator(compiler, min=-sys.float_info.max, max=sys.float_info.max,
-                    exmin=False, exmax=False):
-    """Validate float string
-
-    Args:
-        min (float): the min value, default -sys.float_info.max
-        max (float): the max value, default sys.float_info.max
-        exmin (bool,float): exclude min value or not, default false
-        exmax (bool,float): exclude max value or not, default false
-    """
+cdef _float_bounds(min, max, exmin, exmax):
+    """Normalize bounds of float validator to (min, max, exmin, exmax)"""
     min, max = float(min), float(max)
     if isinstance(exmin, (int, float)) and not isinstance(exmin, bool):
         min = float(exmin)
@@ -834,6 +1445,23 @@ def float_validator(compiler, min=-sys.float_info.max, max=sys.float_info.max,
         exmax = True
     else:
         exmax = bool(exmax)
+    return min, max, exmin, exmax
+
+
+@validator(accept=(int, float, str), output=float)
+def float_validator(compiler, min=-sys.float_info.max, max=sys.float_info.max,
+                    exmin=False, exmax=False):
+    """Validate float string
+
+    Args:
+        min (float): the min value, default -sys.float_info.max
+        max (float): the max value, default sys.float_info.max
+        exmin (bool,float): exclude min value or not, default false
+        exmax (bool,float): exclude max value or not, default false
+    """
+    min, max, exmin, exmax = _float_bounds(min, max, exmin, exmax)
+    cdef bint reuse
+    reuse = getattr(compiler, 'reuse', False)
 
     def validate(value):
         try:
@@ -852,6 +1480,8 @@ def float_validator(compiler, min=-sys.float_info.max, max=sys.float_info.max,
         else:
             if v > max:
                 raise Invalid('value must <= %d' % max)
+        if reuse and type(value) is float:
+            return value
         return v
     return validate
 
@@ -929,6 +1559,154 @@ def bytes_validator(compiler, int minlen=0, int maxlen=-1):
     return validate
 
 
+# directives which not depend on locale, they can be parsed and
+# formatted without strptime and strftime
+_FAST_DATETIME_DIRECTIVES = {
+    # directive: (index of parts, strftime format)
+    'Y': (0, '%04d'),
+    'm': (1, '%02d'),
+    'd': (2, '%02d'),
+    'H': (3, '%02d'),
+    'M': (4, '%02d'),
+    'S': (5, '%02d'),
+    'f': (6, '%06d'),
+    'y': (7, '%02d'),
+    '%': (-1, '%%'),
+}
+_TIME_RE = None
+
+
+cdef _split_datetime_format(str format):
+    """Split format to literal texts and directives, None if not supported"""
+    cdef list parts = []
+    cdef int i = 0
+    cdef int n = len(format)
+    while i < n:
+        if format[i] != '%':
+            parts.append((False, format[i]))
+            i += 1
+            continue
+        if i + 1 >= n or format[i + 1] not in _FAST_DATETIME_DIRECTIVES:
+            return None
+        parts.append((True, format[i + 1]))
+        i += 2
+    return parts
+
+
+def _compile_strptime(str format):
+    """Compile parser of format, same as datetime.strptime but faster
+
+    The regex of directives is copied from _strptime, so the parser
+    accept and reject exactly the same as strptime.
+    """
+    global _TIME_RE
+    if _split_datetime_format(format) is None:
+        return partial(_strptime_datetime, format)
+    try:
+        if _TIME_RE is None:
+            _TIME_RE = _strptime.TimeRE()
+        regex = _TIME_RE.compile(format)
+    except Exception:
+        return partial(_strptime_datetime, format)
+    keys = sorted(regex.groupindex, key=regex.groupindex.get)
+    match = regex.match
+
+    def parse(value):
+        found = match(value)
+        if found is None or found.end() != len(value):
+            raise ValueError('time data does not match format')
+        year = 1900
+        month = day = 1
+        hour = minute = second = microsecond = 0
+        for key, text in zip(keys, found.groups()):
+            if key == 'Y':
+                year = int(text)
+            elif key == 'm':
+                month = int(text)
+            elif key == 'd':
+                day = int(text)
+            elif key == 'H':
+                hour = int(text)
+            elif key == 'M':
+                minute = int(text)
+            elif key == 'S':
+                second = int(text)
+            elif key == 'f':
+                microsecond = int(text + '0' * (6 - len(text)))
+            else:
+                year = int(text)
+                year += 2000 if year <= 68 else 1900
+        return datetime.datetime(
+            year, month, day, hour, minute, second, microsecond)
+
+    return parse
+
+
+def _strptime_datetime(str format, value):
+    return datetime.datetime.strptime(value, format)
+
+
+def _compile_strftime(str format, str kind):
+    """Compile formatter of format, same as strftime but faster
+
+    Args:
+        kind (str): date, time or datetime, the type of values
+    """
+    tokens = _split_datetime_format(format)
+    if tokens is None:
+        return methodcaller('strftime', format)
+    cdef list texts = []
+    cdef list indexes = []
+    cdef bint is_directive
+    for is_directive, token in tokens:
+        if not is_directive:
+            texts.append(token.replace('%', '%%'))
+            continue
+        index, text = _FAST_DATETIME_DIRECTIVES[token]
+        texts.append(text)
+        if index >= 0:
+            indexes.append(index)
+    template = ''.join(texts)
+    if len(indexes) == 1:
+        getter = partial(_getitems_one, indexes[0])
+    elif indexes:
+        getter = itemgetter(*indexes)
+    else:
+        getter = _getitems_none
+
+    if kind == 'time':
+        def strftime(value):
+            return template % getter((
+                1900, 1, 1, value.hour, value.minute,
+                value.second, value.microsecond, 0))
+        return strftime
+
+    is_date = kind == 'date'
+
+    def strftime(value):
+        year = value.year
+        if year < 1000:
+            # strftime not pad zeros for %Y on some platforms
+            return value.strftime(format)
+        if is_date:
+            parts = (year, value.month, value.day, 0, 0, 0, 0, year % 100)
+        else:
+            parts = (
+                year, value.month, value.day, value.hour, value.minute,
+                value.second, value.microsecond, year % 100)
+        return template % getter(parts)
+
+    return strftime
+
+
+def _getitems_one(int index, parts):
+    return (parts[index],)
+
+
+def _getitems_none(parts):
+    return ()
+
+
 @validator(accept=(str, datetime.date), output=(str, datetime.date))
 def date_validator(compiler, str format='%Y-%m-%d', bint output_object=False):
     """Validate date string or convert date to string
@@ -936,16 +1714,19 @@ def date_validator(compiler, str format='%Y-%m-%d', bint output_object=False):
     Args:
         format (str): date format, default ISO8601 format
     """
+    parse = _compile_strptime(format)
+    strftime = _compile_strftime(format, 'date')
+
     def validate(value):
         try:
             if not isinstance(value, (datetime.datetime, datetime.date)):
-                value = datetime.datetime.strptime(value, format)
+                value = parse(value)
             if isinstance(value, datetime.datetime):
                 value = value.date()
             if output_object:
                 return value
             else:
-                return value.strftime(format)
+                return strftime(value)
         except Exception:
             raise Invalid('invalid date') from None
     return validate
@@ -958,16 +1739,19 @@ def time_validator(compiler, str format='%H:%M:%S', bint output_object=False):
     Args:
         format (str): time format, default ISO8601 format
     """
+    parse = _compile_strptime(format)
+    strftime = _compile_strftime(format, 'time')
+
     def validate(value):
         try:
             if not isinstance(value, (datetime.datetime, datetime.time)):
-                value = datetime.datetime.strptime(value, format)
+                value = parse(value)
             if isinstance(value, datetime.datetime):
                 value = value.time()
             if output_object:
                 return value
             else:
-                return value.strftime(format)
+                return strftime(value)
         except Exception:
             raise Invalid('invalid time') from None
     return validate
@@ -980,16 +1764,19 @@ def datetime_validator(compiler, str format='%Y-%m-%dT%H:%M:%S.%fZ', bint output
     Args:
         format (str): datetime format, default ISO8601 format
     """
+    parse = _compile_strptime(format)
+    strftime = _compile_strftime(format, 'datetime')
+
     def validate(value):
         try:
             if isinstance(value, tuple):
                 value = datetime.datetime.fromtimestamp(time.mktime(value))
             elif not isinstance(value, datetime.datetime):
-                value = datetime.datetime.strptime(value, format)
+                value = parse(value)
             if output_object:
                 return value
             else:
-                return value.strftime(format)
+                return strftime(value)
         except Exception:
             raise Invalid('invalid datetime') from None
     return validate
@@ -1278,15 +2065,38 @@ def create_enum_validator(str name, items, bint string=True):
         return validator(accept=object, output=object)(enum_validator)
 
 
+# guard compiling of lazy fields and model plans
+_lazy_compile_lock = threading.RLock()
+
+
 cdef class _Field:
 
     cdef str name
 
-    def __init__(self, str name, schema, compiler):
+    def __init__(self, str name, schema, compiler, bint lazy=False):
         self.name = name
         self.__schema__ = schema
-        with mark_key(self.name):
-            self.validate = compiler.compile(schema)
+        if lazy:
+            self._compiler = compiler
+            self.validate = self._lazy_validate
+        else:
+            with mark_key(self.name):
+                self.validate = compiler.compile(schema)
+
+    def compile(self):
+        """Compile the field if it's lazy, return the validate function"""
+        if getattr(self, '_compiler', None) is None:
+            return self.validate
+        with _lazy_compile_lock:
+            compiler = getattr(self, '_compiler', None)
+            if compiler is not None:
+                with mark_key(self.name):
+                    self.validate = compiler.compile(self.__schema__)
+                self._compiler = None
+        return self.validate
+
+    def _lazy_validate(self, value):
+        return self.compile()(value)
 
     def __repr__(self):
         info = "schema={!r}".format(self.__schema__)
@@ -1309,6 +2119,9 @@ class Field(_Field): pass
 cdef _value_asdict(value):
     if hasattr(value, '__asdict__'):
         return value.__asdict__()
+    elif getattr(type(value), '__reduce__', None) is _record_reduce:
+        # records of dict schema, other namedtuples are converted to lists
+        return {k: _value_asdict(v) for k, v in zip(value._fields, value)}
     elif is_dict(value):
         return {k: _value_asdict(v) for k, v in value.items()}
     elif isinstance(value, (list, tuple, set)):
@@ -1317,54 +2130,190 @@ cdef _value_asdict(value):
         return value
 
 
-def py_model_init(self, obj, params):
-    params_set = set(params)
-    errors = []
-    cdef str k
-    if obj:
-        if len(obj) > 1:
-            msg = (
-                "__init__() takes 2 positional arguments "
-                "but {} were given".format(len(obj) + 1)
-            )
-            raise TypeError(msg)
-        obj = obj[0]
-        if is_dict(obj):
-            getter = get_dict_value
-        else:
-            getter = get_object_value
-        for k in self.__fields__ - params_set:
-            try:
-                setattr(self, k, getter(obj, k))
-            except Invalid as ex:
-                errors.append(ex)
-    else:
-        for k in self.__fields__ - params_set:
+# how to convert field value in model asdict
+cdef int _ASDICT_ANY = 0    # probe value type by _value_asdict
+cdef int _ASDICT_VALUE = 1  # scalar value, use as is
+cdef int _ASDICT_LIST = 2   # list of scalar values, shallow copy
+_ASDICT_KINDS = {'any': _ASDICT_ANY, 'value': _ASDICT_VALUE, 'list': _ASDICT_LIST}
+
+
+cdef class ModelPlan:
+    """Precomputed fields of model class for init, construct and asdict
+
+    Args:
+        fields (list): field names in schema order
+        validators (list): validate function of each field
+        setters (list): slot setter of each field, None means the field
+            is stored in instance __dict__
+        asdict_kinds (list): 'any', 'value' or 'list' of each field
+        use_setattr (bool): set fields by setattr in init, for model
+            class which overrides __setattr__
+        lazy (bool): validators are functions which compile and return
+            the validate function, they are compiled on first init
+    """
+
+    cdef list fields
+    cdef dict fields_index
+    cdef list validators
+    cdef list setters
+    cdef list asdict_kinds
+    cdef bint use_setattr
+    cdef bint has_dict_fields
+    cdef bint lazy
+    cdef object attrs
+
+    def __init__(self, list fields, list validators, list setters,
+                 list asdict_kinds, bint use_setattr=False, bint lazy=False):
+        self.fields = fields
+        self.fields_index = {k: i for i, k in enumerate(fields)}
+        self.validators = validators
+        self.setters = setters
+        self.asdict_kinds = [_ASDICT_KINDS[x] for x in asdict_kinds]
+        self.use_setattr = use_setattr
+        self.has_dict_fields = any(x is None for x in setters)
+        self.lazy = lazy
+        self.attrs = _attrs_getter(fields)
+
+    def compile(self):
+        """Compile validators of lazy plan"""
+        with _lazy_compile_lock:
+            if self.lazy:
+                self.validators = [f() for f in self.validators]
+                self.lazy = False
+
+    def init(self, instance, obj, params):
+        cdef int i
+        cdef str k
+        cdef list errors = []
+        cdef int kind = _VALUE_DICT
+        cdef dict src = None
+        if self.lazy:
+            self.compile()
+        src_values = None
+        if obj:
+            if len(obj) > 1:
+                msg = (
+                    "__init__() takes 2 positional arguments "
+                    "but {} were given".format(len(obj) + 1)
+                )
+                raise TypeError(msg)
+            kind = _value_kind(obj[0])
+            if kind == _VALUE_DICT:
+                src = obj[0]
+            else:
+                src_values = _get_values(obj[0], kind, self.fields, self.attrs)
+        values = instance.__dict__ if self.has_dict_fields else None
+        for i, k in enumerate(self.fields):
+            if params and k in params:
+                value = params[k]
+            elif src is not None:
+                value = src.get(k)
+            elif src_values is not None:
+                value = src_values[i]
+            else:
+                value = None
+            if self.use_setattr:
+                try:
+                    setattr(instance, k, value)
+                except Invalid as ex:
+                    errors.append(ex)
+                continue
             try:
-                setattr(self, k, None)
-            except Invalid as ex:
+                value = self.validators[i](value)
+            except ValidrError as ex:
+                ex.mark_key(k)
+                if not isinstance(ex, Invalid):
+                    raise
                 errors.append(ex)
-    for k in self.__fields__ & params_set:
-        try:
-            setattr(self, k, params[k])
-        except Invalid as ex:
-            errors.append(ex)
-    for k in params_set - self.__fields__:
-        errors.append(Invalid("undesired key").mark_key(k))
-    if errors:
-        raise ModelInvalid(errors)
+                continue
+            setter = self.setters[i]
+            if setter is None:
+                values[k] = value
+            else:
+                setter(instance, value)
+        if params:
+            for k in params:
+                if k not in self.fields_index:
+                    errors.append(Invalid("undesired key").mark_key(k))
+        if errors:
+            raise ModelInvalid(errors)
+
+    def construct_many(self, cls, objs, post_inits, bint immutable):
+        cdef list result = []
+        cdef str k
+        cdef int i
+        set_flag = object.__setattr__
+        for obj in objs:
+            src_values = _get_values(obj, _value_kind(obj), self.fields, self.attrs)
+            instance = cls.__new__(cls)
+            set_flag(instance, '__immutable__', False)
+            values = instance.__dict__ if self.has_dict_fields else None
+            for i, k in enumerate(self.fields):
+                setter = self.setters[i]
+                if setter is None:
+                    values[k] = src_values[i]
+                else:
+                    setter(instance, src_values[i])
+            for post_init in post_inits:
+                post_init(instance)
+            set_flag(instance, '__immutable__', immutable)
+            result.append(instance)
+        return result
 
+    def copy(self, cls, instance, post_inits, bint immutable):
+        """Copy validated instance, scalar values are shared and other
+        values are validated again to copy containers"""
+        cdef str k
+        cdef int i
+        if self.lazy:
+            self.compile()
+        set_flag = object.__setattr__
+        src = instance.__dict__ if self.has_dict_fields else None
+        result = cls.__new__(cls)
+        set_flag(result, '__immutable__', False)
+        values = result.__dict__ if self.has_dict_fields else None
+        for i, k in enumerate(self.fields):
+            setter = self.setters[i]
+            if setter is None:
+                v = src.get(k, None)
+            else:
+                v = getattr(instance, k)
+            if v is not None and self.asdict_kinds[i] != _ASDICT_VALUE:
+                try:
+                    v = self.validators[i](v)
+                except ValidrError as ex:
+                    raise ex.mark_key(k)
+            if setter is None:
+                values[k] = v
+            else:
+                setter(result, v)
+        for post_init in post_inits:
+            post_init(result)
+        set_flag(result, '__immutable__', immutable)
+        return result
 
-def py_model_asdict(self, keys=None):
-    if not keys:
-        keys = self.__fields__
-    else:
-        keys = set(keys) & self.__fields__
-    ret = {}
-    cdef str k
-    for k in keys:
-        v = getattr(self, k)
-        if v is not None:
-            v = _value_asdict(v)
-        ret[k] = v
-    return ret
+    def asdict(self, instance, keys=None):
+        cdef int i
+        cdef int kind
+        cdef str k
+        cdef dict ret = {}
+        if keys:
+            keys = set(keys)
+        else:
+            keys = None
+        values = instance.__dict__ if self.has_dict_fields else None
+        for i, k in enumerate(self.fields):
+            if keys is not None and k not in keys:
+                continue
+            if self.setters[i] is None:
+                v = values.get(k, None)
+            else:
+                v = getattr(instance, k)
+            if v is not None:
+                kind = self.asdict_kinds[i]
+                if kind == _ASDICT_ANY:
+                    v = _value_asdict(v)
+                elif kind == _ASDICT_LIST:
+                    v = list(v)
+            ret[k] = v
+        return ret
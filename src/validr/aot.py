@@ -0,0 +1,191 @@
+"""
+Ahead-of-time compile schemas into cython extension modules
+
+Collect `T(...)` schemas and model classes of a module, generate a pyx
+module with one flat validate function per schema by the codegen backend,
+then build it with cython:
+
+    from validr import aot
+    aot.build('myapp.schemas')     # build myapp/schemas_aot.*.so
+    validators = aot.load('myapp.schemas')
+    validators['User'](data)
+
+Model classes are compiled by their dict schema. The extension is only
+used when its source is the same as the generated source of current
+schemas and validators, otherwise `load` fallback to `Compiler`.
+"""
+import hashlib
+import importlib
+import os
+import tempfile
+
+from ._codegen import _CodeGen
+from .schema import Builder, Compiler, Schema
+
+AOT_MODULE_SUFFIX = '_aot'
+
+_PYX_GLOBALS = {'Invalid', 'ValidrError'}
+
+_PYX_HEADER = '''\
+# cython: language_level=3
+# generated by validr.aot, do not edit
+from validr import Invalid, ValidrError
+
+
+cdef inline _get_value(obj, str key, bint is_dict):
+    if not is_dict:
+        return getattr(obj, key, None)
+    if type(obj) is dict:
+        return (<dict>obj).get(key)
+    return obj.get(key, None)
+
+
+def __validr_bind__(namespace):
+    globals().update(namespace)
+
+'''
+
+
+class _PyxCodeGen(_CodeGen):
+
+    def get_value(self, src, key, is_dict):
+        return '_get_value({}, {}, {})'.format(src, key, is_dict)
+
+
+def _import_module(module):
+    if isinstance(module, str):
+        return importlib.import_module(module)
+    return module
+
+
+def _closure_compiler_of(compiler):
+    if compiler.backend == 'codegen':
+        return compiler._closure_compiler
+    return compiler
+
+
+def collect_schemas(module) -> dict:
+    """Collect schemas and model classes of module
+
+    Args:
+        module: module object or module name
+    Returns:
+        dict of name -> Schema, model classes are collected by dict schema
+    """
+    module = _import_module(module)
+    schemas = {}
+    for name, value in vars(module).items():
+        if name.startswith('_'):
+            continue
+        if isinstance(value, Builder):
+            value = value.__schema__
+        elif isinstance(value, type) and hasattr(value, '__fields__'):
+            value = value.__schema__
+        if isinstance(value, Schema) and value.validator:
+            schemas[name] = value
+    return schemas
+
+
+def _generate(schemas, compiler):
+    closure_compiler = _closure_compiler_of(compiler)
+    functions = {}
+    for name, schema in schemas.items():
+        codegen = _PyxCodeGen(closure_compiler, prefix='_{}_'.format(name))
+        source = codegen.generate(schema, func_name='validate_' + name)
+        digest = hashlib.sha1(source.encode('utf-8')).hexdigest()
+        functions[name] = (source, digest, codegen.namespace)
+    return functions
+
+
+def generate_pyx(schemas, compiler=None) -> str:
+    """Generate pyx source of schemas
+
+    Args:
+        schemas (dict): name -> Schema
+        compiler (Compiler): compiler for the schemas
+    """
+    compiler = compiler or Compiler()
+    functions = _generate(schemas, compiler)
+    lines = [_PYX_HEADER]
+    for source, _, namespace in functions.values():
+        # constants are bound by __validr_bind__ when load
+        lines.append('\n')
+        for key in namespace:
+            if key not in _PYX_GLOBALS:
+                lines.append('{} = None\n'.format(key))
+        lines.append('\n\n' + source)
+    digests = {name: f[1] for name, f in functions.items()}
+    lines.append('\n__validr_aot__ = {!r}\n'.format(digests))
+    return ''.join(lines)
+
+
+def build(module, compiler=None, *, quiet=True) -> str:
+    """Generate pyx of module and build it to extension module
+
+    The extension module named as module name with `_aot` suffix, and
+    placed alongside the module. Cython is required to build.
+
+    Args:
+        module: module object or module name
+        compiler (Compiler): compiler for the schemas
+    Returns:
+        path of the extension module
+    """
+    from Cython.Build import cythonize
+    from setuptools import Distribution, Extension
+    module = _import_module(module)
+    source = generate_pyx(collect_schemas(module), compiler)
+    directory = os.path.dirname(os.path.abspath(module.__file__))
+    name = module.__name__.rpartition('.')[2] + AOT_MODULE_SUFFIX
+    filepath = os.path.join(directory, name + '.pyx')
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(source)
+    ext_modules = cythonize(
+        [Extension(name, [filepath])],
+        compiler_directives={'language_level': 3},
+        quiet=quiet,
+    )
+    dist = Distribution({'ext_modules': ext_modules})
+    if quiet:
+        dist.verbose = 0
+    cmd = dist.get_command_obj('build_ext')
+    cmd.build_lib = directory
+    with tempfile.TemporaryDirectory() as build_temp:
+        cmd.build_temp = build_temp
+        cmd.ensure_finalized()
+        cmd.run()
+    return cmd.get_ext_fullpath(name)
+
+
+def load(module, compiler=None) -> dict:
+    """Load validators of module
+
+    Use functions of the extension module if it's built from the same
+    source, otherwise compile schemas by compiler.
+
+    Args:
+        module: module object or module name
+        compiler (Compiler): compiler for the schemas
+    Returns:
+        dict of name -> validate function
+    """
+    compiler = compiler or Compiler()
+    module = _import_module(module)
+    schemas = collect_schemas(module)
+    try:
+        ext = importlib.import_module(module.__name__ + AOT_MODULE_SUFFIX)
+    except ImportError:
+        ext = None
+    digests = getattr(ext, '__validr_aot__', None) or {}
+    functions = _generate(schemas, compiler) if digests else {}
+    validators = {}
+    for name, schema in schemas.items():
+        _, digest, namespace = functions.get(name, (None, None, None))
+        if digest is not None and digests.get(name) == digest:
+            ext.__validr_bind__(namespace)
+            validate = getattr(ext, 'validate_' + name)
+            validate.__schema__ = schema
+        else:
+            validate = compiler.compile(schema)
+        validators[name] = validate
+    return validators
@@ -0,0 +1,29 @@
+from typing import Callable, Dict, Union
+from types import ModuleType
+
+from .schema import Compiler, Schema
+
+AOT_MODULE_SUFFIX: str
+
+
+def collect_schemas(module: Union[ModuleType, str]) -> Dict[str, Schema]:
+    ...
+
+
+def generate_pyx(schemas: Dict[str, Schema], compiler: Compiler = None) -> str:
+    ...
+
+
+def build(
+    module: Union[ModuleType, str],
+    compiler: Compiler = None,
+    *, quiet: bool = True,
+) -> str:
+    ...
+
+
+def load(
+    module: Union[ModuleType, str],
+    compiler: Compiler = None,
+) -> Dict[str, Callable]:
+    ...
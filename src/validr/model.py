@@ -2,24 +2,60 @@
 Model class is a convenient way to use schema, it's inspired by data class
 but works differently.
 """
-from .schema import Compiler, Schema, T
-from .validator import Field, py_model_asdict, py_model_init
+import weakref
+from types import FunctionType, MemberDescriptorType
+
+from .schema import Compiler, Schema, T, _cache_key_of
+from .validator import Field, ModelPlan, ValidrError, builtin_validators
+
+# validators which output scalar values, model asdict use them as is
+_SCALAR_VALIDATORS = frozenset([
+    'int', 'float', 'bool', 'str', 'nstr', 'bytes',
+    'date', 'time', 'datetime', 'timedelta',
+    'email', 'ipv4', 'ipv6', 'phone', 'idcard',
+    'url', 'fqdn', 'uuid', 'slug',
+])
+
+_MODEL_SETATTR = "_create_model_class.<locals>.Model.__setattr__"
+
+# fields of lazy modelclasses, they are compiled on first use or warmup
+_lazy_fields = weakref.WeakSet()
+
+# shared by modelclasses which not specify compiler
+_default_compiler = None
+
+
+def _get_default_compiler():
+    global _default_compiler
+    if _default_compiler is None:
+        _default_compiler = Compiler()
+    return _default_compiler
 
 
 class ImmutableInstanceError(AttributeError):
     """Raised when an attempt is modify a immutable class"""
 
 
-def modelclass(cls=None, *, compiler=None, immutable=False):
+def modelclass(cls=None, *, compiler=None, immutable=False, slots=False, lazy=False):
     if cls is not None:
-        return _create_model_class(cls, compiler, immutable)
+        return _create_model_class(cls, compiler, immutable, slots, lazy)
 
     def decorator(cls):
-        return _create_model_class(cls, compiler, immutable)
+        return _create_model_class(cls, compiler, immutable, slots, lazy)
 
     return decorator
 
 
+def warmup():
+    """Compile fields of lazy modelclasses
+
+    Raises:
+        SchemaError: schema of some field is invalid
+    """
+    for field in list(_lazy_fields):
+        field.compile()
+
+
 def _extract_schemas(cls):
     schemas = {}
     for k, v in vars(cls).items():
@@ -39,9 +75,107 @@ def _extract_post_init(cls):
     return f
 
 
-def _create_model_class(model_cls, compiler, immutable):
-
-    compiler = compiler or Compiler()
+def _is_builtin(compiler, schema, names):
+    name = schema.validator
+    if name not in names:
+        return False
+    return compiler.validators.get(name) is builtin_validators.get(name)
+
+
+def _is_scalar(compiler, schema):
+    # object outputs may be tuples, eg: url.object outputs ParseResult
+    if schema.params.get('object'):
+        return False
+    return _is_builtin(compiler, schema, _SCALAR_VALIDATORS)
+
+
+def _asdict_kind(compiler, schema):
+    if _is_scalar(compiler, schema):
+        return 'value'
+    if _is_builtin(compiler, schema, {'list'}) and schema.items is not None:
+        # typed arrays are kept as is, same as arrays nested in other values
+        if schema.params.get('array'):
+            return 'value'
+        if _is_scalar(compiler, schema.items):
+            return 'list'
+    return 'any'
+
+
+def _has_custom_setattr(cls):
+    for cls_or_base in cls.__mro__:
+        f = vars(cls_or_base).get("__setattr__")
+        if f is not None:
+            if cls_or_base is object:
+                return False
+            return getattr(f, "__qualname__", None) != _MODEL_SETATTR
+    return False
+
+
+def _has_custom_init(cls):
+    for cls_or_base in cls.__mro__:
+        f = vars(cls_or_base).get("__init__")
+        if f is not None:
+            return not getattr(f, "__model_default_init__", False)
+    return False
+
+
+def _slot_names(cls):
+    names = set()
+    for cls_or_base in cls.__mro__:
+        names.update(vars(cls_or_base).get("__slots__", ()))
+    return names
+
+
+def _update_func_cells(f, old_cls, new_cls):
+    f = getattr(f, "__func__", f)
+    if not isinstance(f, FunctionType) or not f.__closure__:
+        return
+    for cell in f.__closure__:
+        try:
+            if cell.cell_contents is old_cls:
+                cell.cell_contents = new_cls
+        except ValueError:  # empty cell
+            pass
+
+
+def _update_class_cells(cls_dict, old_cls, new_cls):
+    """Let zero argument super() in methods refer to the new class"""
+    for value in cls_dict.values():
+        if isinstance(value, property):
+            for f in (value.fget, value.fset, value.fdel):
+                _update_func_cells(f, old_cls, new_cls)
+        else:
+            _update_func_cells(value, old_cls, new_cls)
+
+
+def _create_slotted_class(model_cls):
+    """Recreate model_cls without instance __dict__"""
+    if "__slots__" in vars(model_cls):
+        return model_cls
+    cls_dict = dict(vars(model_cls))
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    cls_dict["__slots__"] = ()
+    cls = type(model_cls)(model_cls.__name__, model_cls.__bases__, cls_dict)
+    cls.__qualname__ = model_cls.__qualname__
+    _update_class_cells(cls_dict, model_cls, cls)
+    return cls
+
+
+def _create_model_class(model_cls, compiler, immutable, slots=False, lazy=False):
+
+    compiler = compiler or _get_default_compiler()
+
+    if slots:
+        model_cls = _create_slotted_class(model_cls)
+        schemas = {}
+        for cls_or_base in reversed(model_cls.__mro__):
+            schemas.update(_extract_schemas(cls_or_base))
+        exists_slots = _slot_names(model_cls)
+        model_slots = tuple(
+            k for k in list(schemas) + ["__immutable__"]
+            if k not in exists_slots
+        )
 
     class ModelMeta(type):
         def __init__(cls, *args, **kwargs):
@@ -54,9 +188,40 @@ def _create_model_class(model_cls, compiler, immutable):
                     post_inits.append(post_init)
                 for name, schema in _extract_schemas(cls_or_base).items():
                     schemas[name] = schema
+            slot_validators = {}
+            validators = []
+            setters = []
+            # fields of nearest model base, reuse them if schema unchanged
+            base_fields = getattr(cls, "__model_fields__", {})
+            model_fields = {}
             for name, schema in schemas.items():
-                setattr(cls, name, Field(name, schema, compiler))
+                field = base_fields.get(name)
+                if field is None or not (
+                        field.__schema__ is schema or
+                        _cache_key_of(field.__schema__) == _cache_key_of(schema)):
+                    field = Field(name, schema, compiler, lazy=lazy)
+                    if lazy:
+                        _lazy_fields.add(field)
+                model_fields[name] = field
+                validators.append(field.compile if lazy else field.validate)
+                # fields stored in slots are validated by __setattr__
+                member = getattr(cls, name, None)
+                if slots and isinstance(member, MemberDescriptorType):
+                    slot_validators[name] = field.validate
+                    setters.append(member.__set__)
+                else:
+                    setattr(cls, name, field)
+                    setters.append(None)
+            cls.__slot_validators__ = slot_validators
+            cls.__model_fields__ = model_fields
+            cls.__model_plan__ = ModelPlan(
+                list(schemas), validators, setters,
+                [_asdict_kind(compiler, x) for x in schemas.values()],
+                use_setattr=_has_custom_setattr(cls),
+                lazy=lazy,
+            )
             cls.__post_inits = post_inits
+            cls.__custom_init = _has_custom_init(cls)
             cls.__schema__ = T.dict(schemas).__schema__
             cls.__fields__ = frozenset(schemas)
 
@@ -64,6 +229,31 @@ def _create_model_class(model_cls, compiler, immutable):
             for post_init in cls.__post_inits:
                 post_init(instance)
 
+        def construct(cls, **params):
+            """Create instance from trusted field values without validation"""
+            return cls.from_trusted(params)
+
+        def from_trusted(cls, obj):
+            """Create instance from trusted dict or object without validation
+
+            Values are used as is, missing fields are None and other keys
+            are ignored. __post_init__ is called as normal init.
+            """
+            return cls.construct_many([obj])[0]
+
+        def _copy_validated(cls, instance):
+            """Copy validated instance for model validator, return None if
+            __init__ is customized, the copy may lose states it sets"""
+            if cls.__custom_init:
+                return None
+            return cls.__model_plan__.copy(
+                cls, instance, cls.__post_inits, immutable)
+
+        def construct_many(cls, objs) -> list:
+            """Create instances from trusted dicts or objects, see from_trusted"""
+            return cls.__model_plan__.construct_many(
+                cls, objs, cls.__post_inits, immutable)
+
         def __repr__(cls):
             # use __schema__ can keep fields order in python>=3.6
             fields = ", ".join(cls.__schema__.items)
@@ -84,31 +274,71 @@ def _create_model_class(model_cls, compiler, immutable):
                 schema.items[k] = items[k]
             return T(schema)
 
+    if slots:
+        set_flag = object.__setattr__
+    else:
+
+        def set_flag(self, name, value):
+            self.__dict__[name] = value
+
     class Model(model_cls, metaclass=ModelMeta):
 
+        if slots:
+            __slots__ = model_slots
+
         if "__init__" not in model_cls.__dict__:
 
             def __init__(self, *obj, **params):
-                self.__dict__["__immutable__"] = False
-                py_model_init(self, obj, params)
+                set_flag(self, "__immutable__", False)
+                type(self).__model_plan__.init(self, obj, params)
                 type(self).post_init(self)
-                self.__dict__["__immutable__"] = immutable
+                set_flag(self, "__immutable__", immutable)
+
+            __init__.__model_default_init__ = True
 
         else:
 
             def __init__(self, *args, **kwargs):
-                self.__dict__["__immutable__"] = False
+                set_flag(self, "__immutable__", False)
+                if slots:
+                    for k in self.__slot_validators__:
+                        object.__setattr__(self, k, None)
                 super().__init__(*args, **kwargs)
                 type(self).post_init(self)
-                self.__dict__["__immutable__"] = immutable
+                set_flag(self, "__immutable__", immutable)
 
-        if immutable:
+        if slots or immutable:
 
             def __setattr__(self, name, value):
-                if self.__immutable__:
+                if immutable and self.__immutable__:
                     msg = "{} object is immutable!".format(type(self).__name__)
                     raise ImmutableInstanceError(msg)
-                return object.__setattr__(self, name, value)
+                # fields stored in slots are validated here
+                if slots:
+                    validate = self.__slot_validators__.get(name)
+                    if validate is not None:
+                        try:
+                            value = validate(value)
+                        except ValidrError as ex:
+                            raise ex.mark_key(name)
+                object.__setattr__(self, name, value)
+
+        if slots:
+
+            def __getstate__(self):
+                state = dict(getattr(self, "__dict__", None) or {})
+                for k in _slot_names(type(self)) - {"__dict__", "__weakref__"}:
+                    try:
+                        state[k] = object.__getattribute__(self, k)
+                    except AttributeError:
+                        pass
+                return state
+
+            def __setstate__(self, state):
+                for k, v in state.items():
+                    object.__setattr__(self, k, v)
+
+        if immutable:
 
             def __delattr__(self, name):
                 if self.__immutable__:
@@ -141,7 +371,7 @@ def _create_model_class(model_cls, compiler, immutable):
                 return True
 
         def __asdict__(self, *, keys=None):
-            return py_model_asdict(self, keys=keys)
+            return type(self).__model_plan__.asdict(self, keys=keys)
 
     Model.__module__ = model_cls.__module__
     Model.__name__ = model_cls.__name__
@@ -15,6 +15,8 @@ def modelclass(
     cls: typing.Type[M],
     *, compiler: Compiler = None,
     immutable: bool = False,
+    slots: bool = False,
+    lazy: bool = False,
 ) -> typing.Type[M]:
     ...
 
@@ -23,10 +25,16 @@ def modelclass(
 def modelclass(
     *, compiler: Compiler = None,
     immutable: bool = False,
+    slots: bool = False,
+    lazy: bool = False,
 ) -> typing.Callable[[typing.Type[M]], typing.Type[M]]:
     ...
 
 
+def warmup() -> None:
+    ...
+
+
 def fields(m: typing.Any) -> typing.Set[str]:
     ...
 
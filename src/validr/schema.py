@@ -30,55 +30,142 @@ relations:
 """
 import copy
 import enum
+import functools
 import inspect
 import json
-
-from pyparsing import (
-    Group,
-    Keyword,
-    Optional,
-    ParseBaseException,
-    StringEnd,
-    StringStart,
-    Suppress,
-    ZeroOrMore,
-    pyparsing_common,
-    quotedString,
-    removeQuotes,
-    replaceWith,
-)
-
-from .validator import SchemaError, builtin_validators
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+from ._codegen import compile_codegen
+from ._json import compile_json
+from ._ndjson import validate_ndjson
+from ._parallel import validate_parallel
+from .validator import SchemaError, builtin_validators, py_list_stream, py_row_validator
 from .validator import py_mark_index as mark_index
 from .validator import py_mark_key as mark_key
 
+_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+# same identifier chars as pyparsing_common.identifier
+_IDENTIFIER_RE = re.compile(
+    r'[A-Z_a-z\xaa\xb5\xba\xc0-\xd6\xd8-\xf6\xf8-\xff]'
+    r'[0-9A-Z_a-z\xaa\xb5\xb7\xba\xc0-\xd6\xd8-\xf6\xf8-\xff]*')
+_KEYWORD_RE = re.compile(r'(true|false|null)(?![0-9A-Za-z_$])')
+_KEYWORD_VALUES = {'true': True, 'false': False, 'null': None}
+# value not matched, None is the value of null
+_NO_MATCH = object()
+_STRING_RE = re.compile(
+    r'"(?:[^"\n\r\\]|""|\\(?:[^x]|x[0-9a-fA-F]+))*"'
+    r"|'(?:[^'\n\r\\]|''|\\(?:[^x]|x[0-9a-fA-F]+))*'")
+_FLOAT_RE = re.compile(r'[+-]?(?:\d+[eE][+-]?\d+|(?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?)')
+_INT_RE = re.compile(r'[+-]?\d+')
+
+
+class _ElementParser:
+    """Parser of schema element, eg: int.min(0).max(9).optional
+
+    Grammar:
+
+        element := validator ['(' value ')'] ('.' key ['(' value ')'])*
+        value   := true | false | null | quoted string | number
+
+    Whitespaces are allowed between tokens.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+
+    def error(self):
+        line_start = self.text.rfind('\n', 0, self.pos) + 1
+        line_end = self.text.find('\n', self.pos)
+        if line_end < 0:
+            line_end = len(self.text)
+        col = self.pos - line_start + 1
+        line = self.text[line_start:line_end]
+        msg = 'invalid syntax in col {} of {!r}'.format(col, repr(line))
+        return SchemaError(msg)
+
+    def skip_whitespace(self):
+        self.pos = _WHITESPACE_RE.match(self.text, self.pos).end()
+
+    def accept(self, char):
+        self.skip_whitespace()
+        if self.text.startswith(char, self.pos):
+            self.pos += len(char)
+            return True
+        return False
+
+    def match(self, pattern):
+        self.skip_whitespace()
+        m = pattern.match(self.text, self.pos)
+        if m is not None:
+            self.pos = m.end()
+        return m
+
+    def identifier(self):
+        m = self.match(_IDENTIFIER_RE)
+        if m is None:
+            raise self.error()
+        return m.group()
+
+    def value(self):
+        m = self.match(_KEYWORD_RE)
+        if m is not None:
+            return _KEYWORD_VALUES[m.group(1)]
+        m = self.match(_STRING_RE)
+        if m is not None:
+            return m.group()[1:-1]
+        m = self.match(_FLOAT_RE)
+        if m is not None:
+            return float(m.group())
+        m = self.match(_INT_RE)
+        if m is not None:
+            return int(m.group())
+        return _NO_MATCH
+
+    def wrapped_value(self):
+        """Parse optional '(' value ')', backtrack if not matched"""
+        start = self.pos
+        if not self.accept('('):
+            return _NO_MATCH
+        value = self.value()
+        if value is _NO_MATCH or not self.accept(')'):
+            self.pos = start
+            return _NO_MATCH
+        return value
 
-def _make_keyword(kwd_str, kwd_value):
-    return Keyword(kwd_str).setParseAction(replaceWith(kwd_value))
-
-
-def _define_value():
-    TRUE = _make_keyword('true', True)
-    FALSE = _make_keyword('false', False)
-    NULL = _make_keyword('null', None)
-    STRING = quotedString().setParseAction(removeQuotes)
-    NUMBER = pyparsing_common.number()
-    return TRUE | FALSE | NULL | STRING | NUMBER
-
-
-def _define_element():
-    VALIDATOR = pyparsing_common.identifier.setName('validator').setResultsName('validator')
-    ITEMS = _define_value().setName('items').setResultsName('items')
-    ITEMS_WRAPPER = Optional(Suppress('(') + ITEMS + Suppress(')'))
-    PARAMS_KEY = pyparsing_common.identifier.setName('key').setResultsName('key')
-    PARAMS_VALUE = _define_value().setName('value').setResultsName('value')
-    PARAMS_VALUE_WRAPPER = Optional(Suppress('(') + PARAMS_VALUE + Suppress(')'))
-    PARAMS_KEY_VALUE = Group(Suppress('.') + PARAMS_KEY + PARAMS_VALUE_WRAPPER)
-    PARAMS = Group(ZeroOrMore(PARAMS_KEY_VALUE)).setName('params').setResultsName('params')
-    return StringStart() + VALIDATOR + ITEMS_WRAPPER + PARAMS + StringEnd()
-
-
-ELEMENT_GRAMMAR = _define_element()
+    def parse(self):
+        # optional parts are backtracked if not matched, the error is
+        # reported where the rest text starts, same as pyparsing
+        validator = self.identifier()
+        items = self.wrapped_value()
+        if items is _NO_MATCH:
+            items = None
+        params = []
+        while True:
+            start = self.pos
+            if not self.accept('.'):
+                break
+            m = self.match(_IDENTIFIER_RE)
+            if m is None:
+                self.pos = start
+                break
+            key = m.group()
+            value = self.wrapped_value()
+            params.append((key, True if value is _NO_MATCH else value))
+        self.skip_whitespace()
+        if self.pos != len(self.text):
+            raise self.error()
+        return validator, items, tuple(params)
+
+
+def _parse_element_text(text):
+    # pyparsing expand tabs before parsing, keep the same behavior
+    return _ElementParser(text.expandtabs()).parse()
+
+
+_parse_element = functools.lru_cache(maxsize=4096)(_parse_element_text)
 
 
 def _dump_value(value):
@@ -140,6 +227,25 @@ def _is_model(obj):
     return inspect.isclass(obj) and hasattr(obj, '__schema__')
 
 
+def _cache_key_of(obj):
+    """Structural cache key of schema
+
+    Stricter than Schema.__eq__: value types are part of the key, so
+    default(1), default(1.0) and default(True) are different keys, and
+    dict items order is kept because it decides the output keys order.
+    """
+    if isinstance(obj, Schema):
+        params = tuple(sorted(
+            (k, _cache_key_of(v)) for k, v in obj.params.items()))
+        return (obj.validator, _cache_key_of(obj.items), params)
+    elif isinstance(obj, dict):
+        return (dict, tuple((k, _cache_key_of(v)) for k, v in obj.items()))
+    elif isinstance(obj, (list, tuple)):
+        return (type(obj), tuple(_cache_key_of(x) for x in obj))
+    else:
+        return (type(obj), obj)
+
+
 class Schema:
 
     def __init__(self, *, validator=None, items=None, params=None):
@@ -288,22 +394,8 @@ class Schema:
         text = text.strip()
         if not text:
             raise SchemaError("can't parse empty string")
-        try:
-            result = ELEMENT_GRAMMAR.parseString(text, parseAll=True)
-        except ParseBaseException as ex:
-            msg = 'invalid syntax in col {} of {!r}'.format(ex.col, repr(ex.line))
-            raise SchemaError(msg) from None
-        validator = result['validator']
-        items = None
-        if 'items' in result:
-            items = result['items']
-        params = {}
-        for item in result['params']:
-            value = True
-            if 'value' in item:
-                value = item['value']
-            params[item['key']] = value
-        return cls(validator=validator, items=items, params=params)
+        validator, items, params = _parse_element(text)
+        return cls(validator=validator, items=items, params=dict(params))
 
     @classmethod
     def parse_isomorph_schema(cls, obj):
@@ -350,18 +442,297 @@ class Schema:
             raise SchemaError('{} object is not schema'.format(type(obj)))
 
 
+CompileCacheInfo = namedtuple(
+    'CompileCacheInfo', 'hits misses evictions maxsize currsize')
+
+_COMPILE_BACKENDS = {'closure', 'codegen'}
+
+# params of list schema used by compile_stream
+_LIST_STREAM_PARAMS = {'minlen', 'maxlen', 'unique', 'optional'}
+_ROW_PARAMS = {'optional', 'desc', 'slim'}
+
+
 class Compiler:
 
-    def __init__(self, validators=None, is_dump=False):
+    def __init__(self, validators=None, is_dump=False, *,
+                 cache_size=0, backend='closure', lazy_position=False,
+                 reuse=False):
+        """
+        Args:
+            validators (dict): custom validators, override builtin validators
+            cache_size (int): max size of compile cache, 0 means disabled.
+                The cache is LRU, equal schemas share the validate function.
+            backend (str): closure or codegen, the codegen backend generate
+                one flat python function per dict or list schema.
+            lazy_position (bool): not track error position when validating,
+                error position is marked when the error is raised.
+            reuse (bool): return input dicts and lists as is if no item
+                changed, they are shared by outputs, the input should not
+                be modified after validation.
+        """
+        if backend not in _COMPILE_BACKENDS:
+            raise ValueError('unknown compile backend {!r}'.format(backend))
         self.validators = builtin_validators.copy()
         if validators:
             self.validators.update(validators)
         self.is_dump = is_dump
+        self.backend = backend
+        self.cache_size = max(0, int(cache_size or 0))
+        self.lazy_position = lazy_position
+        self.reuse = reuse
+        # mark error position by mark_key and mark_index when validating,
+        # otherwise mark it in exception handlers
+        self.track_position = True
+        if backend == 'codegen':
+            self._closure_compiler = Compiler(cache_size=self.cache_size, reuse=reuse)
+            self._closure_compiler.validators = self.validators
+        if lazy_position:
+            self._tracked_compiler = self._derive(track_position=True)
+            self._untracked_compiler = self._derive(track_position=False)
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._cache_evictions = 0
+
+    def _derive(self, track_position):
+        compiler = Compiler(is_dump=self.is_dump, cache_size=self.cache_size,
+                            backend=self.backend, reuse=self.reuse)
+        compiler.validators = self.validators
+        compiler.track_position = track_position
+        if self.backend == 'codegen':
+            compiler._closure_compiler.validators = self.validators
+            compiler._closure_compiler.track_position = track_position
+        return compiler
+
+    def __getstate__(self):
+        # builtin validators are pickled by name, compiled validators and
+        # cache are not pickled
+        validators = {}
+        for name, validator in self.validators.items():
+            if builtin_validators.get(name) is not validator:
+                validators[name] = validator
+        return {
+            'validators': validators,
+            'is_dump': self.is_dump,
+            'cache_size': self.cache_size,
+            'backend': self.backend,
+            'lazy_position': self.lazy_position,
+            'reuse': self.reuse,
+            'track_position': self.track_position,
+        }
+
+    def __setstate__(self, state):
+        state = dict(state)
+        track_position = state.pop('track_position')
+        self.__init__(**state)
+        self.track_position = track_position
+        if self.backend == 'codegen':
+            self._closure_compiler.track_position = track_position
+
+    def cache_info(self):
+        """Statistics of compile cache"""
+        with self._cache_lock:
+            return CompileCacheInfo(
+                hits=self._cache_hits,
+                misses=self._cache_misses,
+                evictions=self._cache_evictions,
+                maxsize=self.cache_size,
+                currsize=len(self._cache),
+            )
+
+    def cache_clear(self):
+        """Clear compile cache and statistics"""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_hits = 0
+            self._cache_misses = 0
+            self._cache_evictions = 0
 
     def compile(self, schema):
+        return self._cached_compile(schema, self._compile)
+
+    def compile_result(self, schema):
+        """Compile schema to function which return (value, error)
+
+        The function return `(value, None)` if valid, otherwise return
+        `(None, Invalid)` without raise it. Errors of int, float, str, list
+        and dict checks are created with their position and returned
+        directly, it's cheaper than raise Invalid for dirty data.
+        """
+        return self._cached_compile(
+            schema, self._compile_result, kind='result')
+
+    def compile_many(self, schema):
+        """Compile schema to function which validate many values
+
+        The function `validate_many(values, stop_on_error=False)` is a
+        generator of `(index, value)` for valid values and `(index, Invalid)`
+        for invalid values, it stop after the first error if stop_on_error.
+        """
+        validate = self.compile_result(schema)
+
+        def validate_many(values, stop_on_error=False):
+            for index, value in enumerate(values):
+                value, error = validate(value)
+                if error is None:
+                    yield index, value
+                else:
+                    yield index, error
+                    if stop_on_error:
+                        return
+
+        validate_many.__schema__ = validate.__schema__
+        return validate_many
+
+    def compile_json(self, schema):
+        """Compile schema to function which decode and validate JSON
+
+        The function accept str, bytes or file object, it validate values
+        while decoding, items of list schemas are validated one by one and
+        oversized lists are rejected before decode the rest items. It raise
+        Invalid if the JSON is malformed or the value is invalid.
+        """
+        return self._cached_compile(
+            schema, functools.partial(compile_json, self), kind='json')
+
+    def compile_stream(self, schema):
+        """Compile list schema to function which validate items lazily
+
+        The function `validate_stream(values)` accept any iterable and
+        return a generator of validated items, it raise Invalid with
+        position of the invalid item. The minlen is checked when values
+        exhausted, so the items before are yielded already.
+        """
+        schema = _schema_of(schema)
+        if not isinstance(schema, Schema) or schema.validator != 'list':
+            raise SchemaError('compile_stream require list schema')
+        # report schema errors same as compile
+        self.compile(schema)
+        params = {k: v for k, v in schema.params.items()
+                  if k in _LIST_STREAM_PARAMS}
+        validate_stream = py_list_stream(self, schema.items, **params)
+        validate_stream.__schema__ = schema
+        return validate_stream
+
+    def compile_row(self, schema, columns=None, *, output='dict'):
+        """Compile dict schema to function which validate rows by position
+
+        The function `validate_row(row)` accept tuple, list or other
+        iterable, eg: rows of DB-API cursor or csv.reader, each field is
+        get from the column of its name, fields without column and absent
+        columns of short rows are None. Error positions are field names.
+
+        Args:
+            schema (Schema): dict schema or model class
+            columns (list): column names of rows, default names of fields
+            output (str): dict or tuple, tuple of fields in schema order
+        """
+        schema = _schema_of(schema)
+        if not isinstance(schema, Schema) or schema.validator != 'dict':
+            raise SchemaError('compile_row require dict schema with items')
+        if schema.items is None:
+            raise SchemaError('compile_row require dict schema with items')
+        if output not in ('dict', 'tuple'):
+            raise ValueError('output must be dict or tuple')
+        unsupported = set(schema.params) - _ROW_PARAMS
+        if output == 'tuple' and schema.params.get('slim'):
+            unsupported.add('slim')
+        if unsupported:
+            raise SchemaError('not supported params {} for row'.format(
+                ', '.join(sorted(unsupported))))
+        # report schema errors same as compile
+        self.compile(schema)
+        validate_row = py_row_validator(
+            self, schema.items, columns,
+            output_tuple=output == 'tuple',
+            optional=bool(schema.params.get('optional')),
+            slim=bool(schema.params.get('slim')),
+        )
+        validate_row.__schema__ = schema
+        return validate_row
+
+    def validate_parallel(self, schema, values, *,
+                          workers=None, chunksize=1000, ordered=True):
+        """Validate values in process pool
+
+        The compiler and schema are pickled to workers, custom validators
+        must be picklable, eg: defined at module level.
+
+        Args:
+            schema (Schema): the schema
+            values (iterable): values to validate, consumed lazily
+            workers (int): number of worker processes, default cpu count
+            chunksize (int): number of values per task
+            ordered (bool): yield results in order of values or not
+        Returns:
+            generator of (index, value) and (index, Invalid)
+        """
+        schema = _schema_of(schema)
+        return validate_parallel(
+            self, schema, values, workers=workers,
+            chunksize=chunksize, ordered=ordered)
+
+    def validate_ndjson(self, schema, path, output=None, errors=None, *,
+                        workers=None, chunksize=16 * 1024 * 1024):
+        """Validate JSON Lines file in process pool
+
+        The file is mmaped and split into chunks on newline boundaries,
+        valid records are written to output as JSON lines in order of the
+        file, errors of invalid lines are written to errors as JSON lines
+        of line number, position and message. Blank lines are skipped.
+
+        Args:
+            schema (Schema): the schema of each line
+            path (str): path of JSON Lines file
+            output (binary file): write valid records, None to discard
+            errors (binary file): write error report, None to discard
+            workers (int): number of worker processes, default cpu count,
+                validate in current process if it's 1
+            chunksize (int): approximate bytes per task
+        Returns:
+            NDJSONResult of (lines, valid, invalid) counts
+        """
+        schema = _schema_of(schema)
+        return validate_ndjson(
+            self, schema, path, output, errors,
+            workers=workers, chunksize=chunksize)
+
+    def _cached_compile(self, schema, compile_func, kind=None):
         schema = _schema_of(schema)
         if not isinstance(schema, Schema):
             raise SchemaError('{} object is not schema'.format(type(schema)))
+        if self.cache_size <= 0:
+            return compile_func(schema)
+        try:
+            key = _cache_key_of(schema)
+            if kind is not None:
+                key = (kind, key)
+            hash(key)
+        except TypeError:
+            # unhashable params or items, skip cache
+            return compile_func(schema)
+        with self._cache_lock:
+            validate = self._cache.get(key)
+            if validate is not None:
+                self._cache.move_to_end(key)
+                self._cache_hits += 1
+                return validate
+            self._cache_misses += 1
+        validate = compile_func(schema)
+        with self._cache_lock:
+            self._cache[key] = validate
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self._cache_evictions += 1
+        return validate
+
+    def _compile(self, schema):
+        if self.lazy_position:
+            return self._compile_lazy_position(schema)
+        if self.backend == 'codegen':
+            return compile_codegen(self._closure_compiler, schema)
         if not schema.validator:
             raise SchemaError('incomplete schema')
         validator = self.validators.get(schema.validator)
@@ -369,6 +740,17 @@ class Compiler:
             raise SchemaError('validator {!r} not found'.format(schema.validator))
         return validator(self, schema)
 
+    def _compile_result(self, schema):
+        # position of errors are known when generate code
+        compiler = self._tracked_compiler if self.lazy_position else self
+        if compiler.backend == 'codegen':
+            compiler = compiler._closure_compiler
+        return compile_codegen(compiler, schema, result=True)
+
+    def _compile_lazy_position(self, schema):
+        # the input is validated only once, iterators may be consumed
+        return self._untracked_compiler.compile(schema)
+
 
 _BUILDER_INIT = 'init'
 _EXP_ATTR = 'expect-attr'
@@ -1,4 +1,7 @@
-from typing import Callable, Iterable, Union
+from os import PathLike
+from typing import IO, Any, Callable, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .validator import Invalid
 
 
 class Schema:
@@ -18,9 +21,85 @@ class Builder:
 T: Builder
 
 
+class CompileCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class NDJSONResult(NamedTuple):
+    lines: int
+    valid: int
+    invalid: int
+
+
 class Compiler:
-    def __init__(self, validators: dict = None):
+    def __init__(
+        self,
+        validators: dict = None,
+        *, cache_size: int = 0,
+        backend: str = 'closure',
+        lazy_position: bool = False,
+        reuse: bool = False,
+    ):
         ...
 
     def compile(self, schema: Union[Schema, Builder]) -> Callable:
         ...
+
+    def compile_result(
+        self, schema: Union[Schema, Builder],
+    ) -> Callable[[Any], Tuple[Any, Optional[Invalid]]]:
+        ...
+
+    def compile_many(
+        self, schema: Union[Schema, Builder],
+    ) -> Callable[..., Iterator[Tuple[int, Any]]]:
+        ...
+
+    def compile_json(
+        self, schema: Union[Schema, Builder],
+    ) -> Callable[[Union[str, bytes, IO]], Any]:
+        ...
+
+    def compile_stream(
+        self, schema: Union[Schema, Builder],
+    ) -> Callable[[Iterable], Iterator[Any]]:
+        ...
+
+    def compile_row(
+        self,
+        schema: Union[Schema, Builder, type],
+        columns: Sequence[str] = None,
+        *, output: str = 'dict',
+    ) -> Callable[[Any], Any]:
+        ...
+
+    def validate_parallel(
+        self,
+        schema: Union[Schema, Builder],
+        values: Iterable,
+        *, workers: int = None,
+        chunksize: int = 1000,
+        ordered: bool = True,
+    ) -> Iterator[Tuple[int, Any]]:
+        ...
+
+    def validate_ndjson(
+        self,
+        schema: Union[Schema, Builder],
+        path: Union[str, PathLike],
+        output: Optional[IO[bytes]] = None,
+        errors: Optional[IO[bytes]] = None,
+        *, workers: int = None,
+        chunksize: int = 16 * 1024 * 1024,
+    ) -> NDJSONResult:
+        ...
+
+    def cache_info(self) -> CompileCacheInfo:
+        ...
+
+    def cache_clear(self) -> None:
+        ...
@@ -1,4 +1,6 @@
 try:
     from ._validator_c import *  # noqa: F401,F403
+    from ._validator_c import _key_func_of_schema, _record_class  # noqa: F401
 except ImportError:
     from ._validator_py import *  # noqa: F401,F403
+    from ._validator_py import _key_func_of_schema, _record_class  # noqa: F401
@@ -0,0 +1,113 @@
+import sys
+import types
+
+import pytest
+from validr import T, Compiler, Invalid, aot
+
+SCHEMAS_SOURCE = '''
+from validr import T, modelclass
+
+User = T.dict(
+    id=T.int.min(0),
+    name=T.str.maxlen(10),
+    tags=T.list(T.str).optional,
+)
+
+
+@modelclass
+class Point:
+    x = T.int
+    y = T.int
+
+
+_private = T.int
+'''
+
+
+def _get_value(obj, key, is_dict):
+    if not is_dict:
+        return getattr(obj, key, None)
+    return obj.get(key, None)
+
+
+def _fake_extension(name, schemas, compiler, digests=None):
+    """Simulate built extension module by exec generated functions"""
+    module = types.ModuleType(name)
+    namespace = vars(module)
+    namespace['_get_value'] = _get_value
+    namespace['__validr_bind__'] = namespace.update
+    exec('from validr import Invalid, ValidrError', namespace)
+    functions = aot._generate(schemas, compiler)
+    for source, _, _ in functions.values():
+        exec(source, namespace)
+    if digests is None:
+        digests = {k: f[1] for k, f in functions.items()}
+    module.__validr_aot__ = digests
+    return module
+
+
+@pytest.fixture
+def schemas_module(tmp_path, monkeypatch):
+    name = 'validr_aot_schemas_{}'.format(id(tmp_path))
+    tmp_path.joinpath(name + '.py').write_text(SCHEMAS_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield name
+    for key in [name, name + aot.AOT_MODULE_SUFFIX]:
+        sys.modules.pop(key, None)
+
+
+def test_collect_schemas(schemas_module):
+    schemas = aot.collect_schemas(schemas_module)
+    assert set(schemas) == {'User', 'Point'}
+    assert schemas['User'] == T.dict(
+        id=T.int.min(0),
+        name=T.str.maxlen(10),
+        tags=T.list(T.str).optional,
+    ).__schema__
+    assert schemas['Point'] == T.dict(x=T.int, y=T.int).__schema__
+
+
+def test_generate_pyx(schemas_module):
+    schemas = aot.collect_schemas(schemas_module)
+    source = aot.generate_pyx(schemas)
+    assert 'def validate_User(value):' in source
+    assert 'def validate_Point(value):' in source
+    assert 'cdef inline _get_value' in source
+    assert '__validr_aot__ = ' in source
+
+
+def test_load_without_extension(schemas_module):
+    validators = aot.load(schemas_module)
+    assert set(validators) == {'User', 'Point'}
+    assert validators['Point']({'x': 1, 'y': '2'}) == {'x': 1, 'y': 2}
+    with pytest.raises(Invalid) as exinfo:
+        validators['User']({'id': -1, 'name': 'x'})
+    assert exinfo.value.position == 'id'
+
+
+def test_load_extension(schemas_module):
+    compiler = Compiler()
+    schemas = aot.collect_schemas(schemas_module)
+    ext_name = schemas_module + aot.AOT_MODULE_SUFFIX
+    sys.modules[ext_name] = _fake_extension(ext_name, schemas, compiler)
+    validators = aot.load(schemas_module, compiler)
+    f = validators['User']
+    assert f.__name__ == 'validate_User'
+    assert f.__schema__ == schemas['User']
+    value = {'id': '1', 'name': 'x', 'tags': [1, 'y']}
+    assert f(value) == compiler.compile(schemas['User'])(value)
+    with pytest.raises(Invalid) as exinfo:
+        f({'id': 1, 'name': 'x', 'tags': [None]})
+    assert exinfo.value.position == 'tags[0]'
+
+
+def test_load_stale_extension(schemas_module):
+    compiler = Compiler()
+    schemas = aot.collect_schemas(schemas_module)
+    ext_name = schemas_module + aot.AOT_MODULE_SUFFIX
+    sys.modules[ext_name] = _fake_extension(
+        ext_name, schemas, compiler, digests={'User': 'stale'})
+    validators = aot.load(schemas_module, compiler)
+    assert validators['User'].__name__ != 'validate_User'
+    assert validators['Point'].__name__ != 'validate_Point'
+    assert validators['Point']({'x': 1, 'y': 2}) == {'x': 1, 'y': 2}
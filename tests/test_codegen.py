@@ -0,0 +1,195 @@
+import pytest
+from validr import T, Compiler, Invalid, SchemaError, modelclass, validator
+
+
+@modelclass
+class User:
+    id = T.int.min(0)
+    name = T.str.optional
+
+
+class Point:
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+closure_compiler = Compiler()
+codegen_compiler = Compiler(backend='codegen')
+
+
+def _run(f, value):
+    try:
+        return 'ok', f(value)
+    except Invalid as ex:
+        return 'invalid', ex.message, ex.position, ex.value
+
+
+SCHEMAS = {
+    'wide': T.dict(
+        id=T.int.min(0).max(9),
+        name=T.str.minlen(2).maxlen(4).strip,
+        score=T.float.exmin(0).max(100),
+        ratio=T.float.min(0).exmax(1).default(0.5),
+        tags=T.list(T.str).minlen(1).maxlen(3).optional,
+        email=T.email.optional,
+        flag=T.bool.default(False),
+        kind=T.enum('a b c').invalid_to('a'),
+        count=T.int.invalid_to_default.default(1),
+        nested=T.dict(x=T.int, y=T.int.optional).optional,
+    ),
+    'list_of_dict': T.list(T.dict(x=T.int, y=T.list(T.int.min(0)))),
+    'slim': T.dict(a=T.int.optional, b=T.str.optional).slim,
+    'fallback': T.dict(
+        union=T.union([T.int, T.list(T.int)]).optional,
+        model=T.model(User).optional,
+        unique=T.list(T.int).unique.optional,
+        dynamic=T.dict.key(T.str.minlen(2)).optional,
+        any=T.any.optional,
+    ),
+    'point': T.dict(x=T.int, y=T.int),
+}
+
+VALUES = {
+    'wide': [
+        {'id': 1, 'name': ' abc ', 'score': 50, 'tags': ['x'], 'kind': 'b'},
+        {'id': '5', 'name': 'ab', 'score': '1.5', 'ratio': None, 'flag': 'yes'},
+        {'id': 1, 'name': 'ab', 'score': 1, 'kind': 'x', 'count': 'x'},
+        {'id': 10, 'name': 'ab', 'score': 1},
+        {'id': None, 'name': 'ab', 'score': 1},
+        {'id': 1, 'name': 'a', 'score': 1},
+        {'id': 1, 'name': 123, 'score': 1},
+        {'id': 1, 'name': object(), 'score': 1},
+        {'id': 1, 'name': 'ab', 'score': 0},
+        {'id': 1, 'name': 'ab', 'score': 1, 'ratio': 1},
+        {'id': 1, 'name': 'ab', 'score': 1, 'tags': []},
+        {'id': 1, 'name': 'ab', 'score': 1, 'tags': ['a', 'b', 'c', 'd']},
+        {'id': 1, 'name': 'ab', 'score': 1, 'tags': ['a', None]},
+        {'id': 1, 'name': 'ab', 'score': 1, 'tags': 123},
+        {'id': 1, 'name': 'ab', 'score': 1, 'email': 'x'},
+        {'id': 1, 'name': 'ab', 'score': 1, 'email': 123},
+        {'id': 1, 'name': 'ab', 'score': 1, 'flag': 'x'},
+        {'id': 1, 'name': 'ab', 'score': 1, 'nested': {'x': 'x'}},
+        {'id': 1, 'name': 'ab', 'score': 1, 'nested': {'x': 1, 'y': 2}},
+        None,
+        'string',
+    ],
+    'list_of_dict': [
+        [{'x': 1, 'y': [1, 2]}],
+        [{'x': 1, 'y': [1, -2]}],
+        [{'x': 1, 'y': []}, {'x': 'x', 'y': []}],
+        [None],
+        None,
+        123,
+        (x for x in [{'x': 1, 'y': [0]}]),
+    ],
+    'slim': [
+        {'a': 1, 'b': 'x'},
+        {'a': None, 'b': ''},
+        {},
+    ],
+    'fallback': [
+        {'union': [1, 2], 'model': {'id': 1}, 'unique': [1, 2], 'dynamic': {'xx': 1}},
+        {'union': 'x'},
+        {'model': {'id': -1}},
+        {'unique': [1, 1]},
+        {'dynamic': {'x': 1}},
+        {'any': [1, {'a': 2}]},
+    ],
+    'point': [
+        Point(1, 2),
+        Point('x', 2),
+        {'x': 1, 'y': 2},
+    ],
+}
+
+
+@pytest.mark.parametrize('name,value', [
+    (name, value) for name, values in VALUES.items() for value in values
+])
+def test_same_as_closure(name, value):
+    schema = SCHEMAS[name]
+    f_closure = closure_compiler.compile(schema)
+    f_codegen = codegen_compiler.compile(schema)
+    if hasattr(value, '__next__'):
+        value = list(value)
+    assert _run(f_codegen, value) == _run(f_closure, value)
+
+
+@pytest.mark.parametrize('name,value', [
+    (name, value) for name, values in VALUES.items() for value in values
+])
+def test_result_same_as_closure(name, value):
+    schema = SCHEMAS[name]
+    f_closure = closure_compiler.compile(schema)
+    f_result = closure_compiler.compile_result(schema)
+    if hasattr(value, '__next__'):
+        value = list(value)
+    expect = _run(f_closure, value)
+    result, error = f_result(value)
+    if error is None:
+        assert ('ok', result) == expect
+    else:
+        assert result is None
+        assert ('invalid', error.message, error.position, error.value) == expect
+
+
+def test_compile_result():
+    schema = T.dict(
+        id=T.int.min(0),
+        tags=T.list(T.str.maxlen(2)),
+        kind=T.int.invalid_to(0),
+        email=T.email.optional,
+    )
+    f = Compiler(cache_size=8).compile_result(schema)
+    assert 'raise' not in f.__source__
+    assert f({'id': 1, 'tags': ['a'], 'kind': 'x'}) == (
+        {'id': 1, 'tags': ['a'], 'kind': 0, 'email': ''}, None)
+    result, error = f({'id': 1, 'tags': ['a', 'abc'], 'kind': 1})
+    assert result is None
+    assert isinstance(error, Invalid)
+    assert error.position == 'tags[1]'
+    assert error.value == 'abc'
+    result, error = f({'id': 1, 'tags': [], 'kind': 1, 'email': 'x'})
+    assert error.position == 'email'
+    # leaf schema
+    assert closure_compiler.compile_result(T.int)('x')[1].message == 'invalid int'
+    assert closure_compiler.compile_result(T.int)('1') == (1, None)
+
+
+def test_codegen_function():
+    f = codegen_compiler.compile(SCHEMAS['wide'])
+    assert f.__schema__ == SCHEMAS['wide']
+    assert f.__name__ == closure_compiler.compile(SCHEMAS['wide']).__name__
+    assert 'with ' not in f.__source__
+    # leaf schema is compiled by closure backend
+    assert not hasattr(codegen_compiler.compile(T.int), '__source__')
+
+
+def test_codegen_schema_error():
+    with pytest.raises(SchemaError) as exinfo:
+        codegen_compiler.compile(T.dict(x=T.list(T.unknown)))
+    assert exinfo.value.position == 'x[]'
+
+
+def test_codegen_custom_validator():
+
+    @validator(accept=str, output=str)
+    def int_validator(compiler):
+        def validate(value):
+            return value.upper()
+        return validate
+
+    compiler = Compiler(validators={'int': int_validator}, backend='codegen')
+    f = compiler.compile(T.dict(x=T.int))
+    assert f({'x': 'abc'}) == {'x': 'ABC'}
+    with pytest.raises(Invalid) as exinfo:
+        f({'x': 123})
+    assert exinfo.value.message == 'require string value'
+    assert exinfo.value.position == 'x'
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        Compiler(backend='unknown')
@@ -1,7 +1,8 @@
+import pickle
 from datetime import date
 
 import pytest
-from validr import Invalid, SchemaError, Compiler, T
+from validr import Invalid, SchemaError, Compiler, T, validator
 
 from .helper import schema_error_position
 
@@ -74,3 +75,311 @@ def test_exception_value(schema, value, expect):
 )
 def test_schema_error_position():
     pass
+
+
+def test_compile_cache():
+    compiler = Compiler(cache_size=16)
+    f1 = compiler.compile(T.int.min(0))
+    f2 = compiler.compile(T.int.min(0))
+    assert f1 is f2
+    info = compiler.cache_info()
+    assert (info.hits, info.misses, info.evictions) == (1, 1, 0)
+    f3 = compiler.compile(T.dict(a=T.int.min(0), b=T.list(T.int.min(0))))
+    assert f3({'a': 1, 'b': [2]}) == {'a': 1, 'b': [2]}
+    assert compiler.cache_info().hits == 3
+    compiler.cache_clear()
+    assert compiler.cache_info() == (0, 0, 0, 16, 0)
+    assert compiler.compile(T.int.min(0)) is not f1
+
+
+def test_compile_cache_key_strict():
+    compiler = Compiler(cache_size=16)
+    assert compiler.compile(T.int.default(1))(None) == 1
+    assert compiler.compile(T.bool.default(True))(None) is True
+    assert compiler.compile(T.float.default(1.0))(None) == 1.0
+    f1 = compiler.compile(T.dict(a=T.int, b=T.int))
+    f2 = compiler.compile(T.dict(b=T.int, a=T.int))
+    assert f1 is not f2
+    assert list(f2({'a': 1, 'b': 2})) == ['b', 'a']
+    assert compiler.cache_info().hits == 3  # T.int leaves
+
+
+def test_compile_cache_eviction():
+    compiler = Compiler(cache_size=2)
+    f1 = compiler.compile(T.int.min(1))
+    compiler.compile(T.int.min(2))
+    assert compiler.compile(T.int.min(1)) is f1
+    compiler.compile(T.int.min(3))
+    info = compiler.cache_info()
+    assert info.evictions == 1
+    assert info.currsize == 2
+    assert compiler.compile(T.int.min(1)) is f1
+    assert Compiler().cache_info().maxsize == 0
+
+
+LAZY_POSITION_SCHEMA = T.dict(
+    id=T.int.min(0),
+    tags=T.list(T.str.maxlen(3)).unique.optional,
+    items=T.list(T.dict(x=T.int, y=T.list(T.int).optional)).optional,
+    extra=T.dict.key(T.str.maxlen(3)).value(T.int).optional,
+)
+
+
+@pytest.mark.parametrize('value', [
+    {'id': 1, 'tags': ['a', 'b'], 'items': [{'x': 1, 'y': [1, '2']}]},
+    {'id': -1},
+    {'id': 1, 'tags': ['a', 'abcd']},
+    {'id': 1, 'tags': ['a', 'a']},
+    {'id': 1, 'items': [{'x': 1}, {'x': 2, 'y': [1, 'x']}]},
+    {'id': 1, 'extra': {'abcd': 1}},
+    {'id': 1, 'extra': {'a': 'x'}},
+    {'id': 1, 'items': 'x'},
+])
+def test_lazy_position(value):
+    def run(f):
+        try:
+            return f(value)
+        except Invalid as ex:
+            return ex.message, ex.position, ex.field, ex.value, ex.marks
+    expect = run(Compiler().compile(LAZY_POSITION_SCHEMA))
+    compiler = Compiler(lazy_position=True)
+    f = compiler.compile(LAZY_POSITION_SCHEMA)
+    assert run(f) == expect
+    assert f.__schema__ == LAZY_POSITION_SCHEMA.__schema__
+    f = Compiler(lazy_position=True, backend='codegen').compile(LAZY_POSITION_SCHEMA)
+    assert run(f) == expect
+
+
+@pytest.mark.parametrize('backend', ['closure', 'codegen'])
+def test_lazy_position_iterator(backend):
+    compiler = Compiler(lazy_position=True, backend=backend)
+    # the input is validated once, invalid items of iterators are reported
+    with pytest.raises(Invalid) as exinfo:
+        compiler.compile(T.list(T.int))(x for x in [1, 'x', 2])
+    assert exinfo.value.position == '[1]'
+    with pytest.raises(Invalid) as exinfo:
+        compiler.compile(T.dict(a=T.list(T.int)))({'a': iter([1, 'x'])})
+    assert exinfo.value.position == 'a[1]'
+    assert compiler.compile(T.list(T.int))(x for x in [1, '2']) == [1, 2]
+
+
+def test_lazy_position_schema_error():
+    with pytest.raises(SchemaError) as exinfo:
+        Compiler(lazy_position=True).compile(T.dict(key=T.list(T.unknown)))
+    assert exinfo.value.position == 'key[]'
+
+
+def test_compile_many():
+    f = Compiler().compile_many(T.dict(id=T.int.min(0), tags=T.list(T.str)))
+    values = [
+        {'id': 1, 'tags': []},
+        {'id': -1, 'tags': []},
+        {'id': '2', 'tags': ['x', None]},
+        {'id': 3, 'tags': ['y']},
+    ]
+    results = list(f(iter(values)))
+    assert [i for i, _ in results] == [0, 1, 2, 3]
+    assert results[0][1] == {'id': 1, 'tags': []}
+    assert results[3][1] == {'id': 3, 'tags': ['y']}
+    errors = [(i, v.position) for i, v in results if isinstance(v, Invalid)]
+    assert errors == [(1, 'id'), (2, 'tags[1]')]
+    results = list(f(values, stop_on_error=True))
+    assert len(results) == 2
+    assert results[1][1].position == 'id'
+    assert list(f([])) == []
+
+
+@pytest.mark.parametrize('compiler', [
+    Compiler(),
+    Compiler(backend='codegen'),
+    Compiler(lazy_position=True),
+])
+def test_compile_stream(compiler):
+    f = compiler.compile_stream(T.list(T.dict(id=T.int)).maxlen(3))
+    assert f.__schema__ == T.list(T.dict(id=T.int)).maxlen(3)
+    values = iter([{'id': 1}, {'id': '2'}, {'id': 'x'}])
+    stream = f(values)
+    assert next(stream) == {'id': 1}
+    assert next(stream) == {'id': 2}
+    with pytest.raises(Invalid) as exinfo:
+        next(stream)
+    assert exinfo.value.position == '[2].id'
+    assert list(f(iter([]))) == []
+    with pytest.raises(Invalid) as exinfo:
+        list(f({'id': i} for i in range(4)))
+    assert 'length' in exinfo.value.message
+    with pytest.raises(Invalid):
+        f(None)
+    with pytest.raises(Invalid):
+        f(123)
+
+
+def test_compile_stream_params():
+    f = Compiler().compile_stream(T.list(T.int).minlen(2).unique.optional)
+    assert list(f(None)) == []
+    assert list(f(x for x in ['1', 2, 3])) == [1, 2, 3]
+    with pytest.raises(Invalid) as exinfo:
+        list(f([1]))
+    assert 'length' in exinfo.value.message
+    with pytest.raises(Invalid) as exinfo:
+        list(f([1, 2, '1']))
+    assert exinfo.value.position == '[2]'
+    assert list(Compiler().compile_stream(T.list)([{'x': 1}])) == [{'x': 1}]
+    with pytest.raises(SchemaError):
+        Compiler().compile_stream(T.dict(id=T.int))
+    with pytest.raises(SchemaError):
+        Compiler().compile_stream(T.list(T.unknown))
+
+
+ROW_SCHEMA = T.dict(
+    id=T.int.min(0),
+    name=T.str.optional,
+    tag=T.str.default('x'),
+)
+
+
+@pytest.mark.parametrize('compiler', [
+    Compiler(),
+    Compiler(backend='codegen'),
+    Compiler(lazy_position=True),
+])
+def test_compile_row(compiler):
+    f = compiler.compile_row(ROW_SCHEMA, ['name', 'id', 'other'])
+    assert f.__schema__ == ROW_SCHEMA
+    expect = {'id': 1, 'name': 'a', 'tag': 'x'}
+    assert f(('a', '1', 'other')) == expect
+    assert f(['a', 1]) == expect
+    assert f(x for x in ['a', 1]) == expect
+    with pytest.raises(Invalid) as exinfo:
+        f(('a', -1))
+    assert exinfo.value.position == 'id'
+    with pytest.raises(Invalid) as exinfo:
+        f(('a',))
+    assert exinfo.value.position == 'id'
+    for value in [None, 1, 'a1', {'id': 1}]:
+        with pytest.raises(Invalid):
+            f(value)
+    f = compiler.compile_row(ROW_SCHEMA, output='tuple')
+    assert f((1, 'a', 'b')) == (1, 'a', 'b')
+    assert f([1]) == (1, '', 'x')
+
+
+def test_compile_row_params():
+    compiler = Compiler()
+    f = compiler.compile_row(ROW_SCHEMA.optional.slim)
+    assert f(None) is None
+    assert f((1,)) == {'id': 1, 'tag': 'x'}
+    with pytest.raises(SchemaError):
+        compiler.compile_row(ROW_SCHEMA.slim, output='tuple')
+    with pytest.raises(SchemaError):
+        compiler.compile_row(ROW_SCHEMA.minlen(1))
+    with pytest.raises(SchemaError):
+        compiler.compile_row(T.list(T.int))
+    with pytest.raises(SchemaError):
+        compiler.compile_row(T.dict.key(T.str))
+    with pytest.raises(SchemaError):
+        compiler.compile_row(ROW_SCHEMA, ['id', 'id'])
+    with pytest.raises(ValueError):
+        compiler.compile_row(ROW_SCHEMA, output='list')
+
+
+REUSE_SCHEMA = T.dict(
+    id=T.int,
+    score=T.float,
+    name=T.str.optional,
+    date=T.date,
+    tags=T.list(T.str),
+    extra=T.any,
+    meta=T.dict.optional,
+    items=T.list(T.dict(x=T.int)).optional,
+)
+
+
+@pytest.mark.parametrize('compiler', [
+    Compiler(reuse=True),
+    Compiler(reuse=True, backend='codegen'),
+    Compiler(reuse=True, lazy_position=True),
+])
+def test_reuse(compiler):
+    f = compiler.compile(REUSE_SCHEMA)
+    value = {
+        'id': 1, 'score': 0.5, 'name': 'x', 'date': '2020-01-01',
+        'tags': ['a', 'b'], 'extra': {'k': [1]}, 'meta': {'k': 1},
+        'items': [{'x': 1}, {'x': 2}],
+    }
+    assert f(value) is value
+    assert compiler.compile_result(REUSE_SCHEMA)(value)[0] is value
+    # changed values
+    result = f(dict(value, id='2', tags=['a', 1], items=({'x': 1},)))
+    assert result == dict(value, id=2, tags=['a', '1'], items=[{'x': 1}])
+    assert result['items'][0] is not value['items'][0]
+    assert result['extra'] is value['extra']
+    assert result['date'] is value['date']
+    # missing and unknown keys
+    other = dict(value, unknown=1)
+    other.pop('name')
+    result = f(other)
+    assert result == dict(value, name='')
+    assert result['tags'] is value['tags']
+    # not reused
+    assert Compiler().compile(REUSE_SCHEMA)(value) is not value
+    assert f(dict(value, date='2020-1-1'))['date'] == '2020-01-01'
+
+
+def test_reuse_slim():
+    f = Compiler(reuse=True).compile(T.dict(x=T.int.optional).slim)
+    value = {'x': 1}
+    assert f(value) is value
+    assert f({'x': None}) == {}
+    f = Compiler(reuse=True).compile(T.dict.slim)
+    assert f(value) is value
+    assert f({'x': ''}) == {}
+
+
+@validator(accept=str, output=str)
+def _upper_validator(compiler):
+    def validate(value):
+        return value.upper()
+    return validate
+
+
+def test_compiler_pickle():
+    compiler = Compiler(
+        validators={'upper': _upper_validator}, cache_size=8,
+        backend='codegen', lazy_position=True, reuse=True)
+    compiler.compile(T.int)
+    compiler2 = pickle.loads(pickle.dumps(compiler))
+    assert compiler2.validators == compiler.validators
+    assert compiler2.cache_size == 8
+    assert compiler2.backend == 'codegen'
+    assert compiler2.lazy_position
+    assert compiler2.reuse
+    assert compiler2.cache_info().currsize == 0
+    f = compiler2.compile(T.dict(x=T.upper, y=T.int))
+    assert f({'x': 'a', 'y': '1'}) == {'x': 'A', 'y': 1}
+    untracked = pickle.loads(pickle.dumps(compiler._untracked_compiler))
+    assert not untracked.track_position
+    assert not untracked._closure_compiler.track_position
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_validate_parallel(ordered):
+    compiler = Compiler(validators={'upper': _upper_validator})
+    schema = T.dict(id=T.int.min(0), name=T.upper)
+    values = ({'id': i, 'name': 'x'} if i % 7 else {'id': -i} for i in range(1, 100))
+    results = compiler.validate_parallel(
+        schema, values, workers=2, chunksize=10, ordered=ordered)
+    results = list(results)
+    if ordered:
+        assert [i for i, _ in results] == list(range(99))
+    results = dict(results)
+    assert len(results) == 99
+    assert results[0] == {'id': 1, 'name': 'X'}
+    error = results[6]
+    assert isinstance(error, Invalid)
+    assert error.position == 'id'
+    assert error.value == -7
+    with pytest.raises(SchemaError):
+        compiler.validate_parallel(T.unknown, [])
+    with pytest.raises(ValueError):
+        compiler.validate_parallel(schema, [], chunksize=0)
@@ -11,6 +11,10 @@ elements = {
         T.int.min(0).max(10).optional.default(5).desc('a number'),
     'abc("A B C")': T.abc('A B C'),
     "abc('A B C')": T.abc('A B C'),
+    'abc("A""B")': T.abc('A""B'),
+    'int . min( -1 ) .max (+9)': T.int.min(-1).max(9),
+    'float.min(.5).max(1e3)': T.float.min(0.5).max(1000.0),
+    'abc(true).x(false).y(null)': T.abc(True).x(False).y(None),
 }
 
 invalid_elements = [
@@ -21,6 +25,11 @@ invalid_elements = [
     'int.range(0,10)',
     'int.range([0,10])',
     'abc([1,2,3])',
+    'int.min(1abc)',
+    'abc(truex)',
+    'abc("unclosed)',
+    'int..min',
+    '1int',
 ]
 
 
@@ -35,3 +44,38 @@ def test_elements(string, expect):
 def test_invalid_elements(string):
     with pytest.raises(SchemaError):
         Schema.parse_element(string)
+
+
+@pytest.mark.parametrize('string, expect', [
+    ('int.min(1)', 1),
+    ('int.min(1.)', 1.0),
+    ('int.min(1e2)', 100.0),
+    ('int.min(-0)', 0),
+])
+def test_element_number_type(string, expect):
+    value = Schema.parse_element(string).params['min']
+    assert value == expect
+    assert type(value) is type(expect)
+
+
+def test_parse_element_cached_copy():
+    e1 = Schema.parse_element('int.min(0)')
+    e1.params['max'] = 9
+    e2 = Schema.parse_element('int.min(0)')
+    assert e2.params == {'min': 0}
+
+
+@pytest.mark.parametrize('string, message', [
+    ('int.min(0)x', 'invalid syntax in col 11 of "\'int.min(0)x\'"'),
+    # unmatched optional parts are backtracked, same as pyparsing
+    ('int.min(', 'invalid syntax in col 8 of "\'int.min(\'"'),
+    ('int..a', 'invalid syntax in col 4 of "\'int..a\'"'),
+    ('int.min(1', 'invalid syntax in col 8 of "\'int.min(1\'"'),
+    ('int.\n  max(x)', 'invalid syntax in col 6 of "\'  max(x)\'"'),
+    ('abc(truex)', 'invalid syntax in col 4 of "\'abc(truex)\'"'),
+    ('int.min(1abc)', 'invalid syntax in col 8 of "\'int.min(1abc)\'"'),
+])
+def test_invalid_element_message(string, message):
+    with pytest.raises(SchemaError) as exinfo:
+        Schema.parse_element(string)
+    assert exinfo.value.message == message
@@ -0,0 +1,97 @@
+import io
+import json
+
+import pytest
+from validr import Compiler, Invalid, SchemaError, T
+
+SCHEMA = T.dict(
+    id=T.int.min(0),
+    users=T.list(T.dict(
+        name=T.str,
+        tags=T.list(T.str).maxlen(2).optional,
+    )).maxlen(3).optional,
+    meta=T.dict(key=T.str).optional,
+)
+
+VALID_CASES = [
+    '{"id": 1}',
+    '{"id": "1", "users": null, "unknown": [1, {"x": 2}]}',
+    ' {"id": 1, "users": [], "meta": {"key": "x"}} ',
+    '{"users": [{"name": "a", "tags": ["x"]}, {"name": "b"}], "id": 0}',
+]
+
+INVALID_CASES = [
+    ('{"id": -1}', 'id'),
+    ('{"id": 1, "users": [{"name": "a"}, {"name": null}]}', 'users[1].name'),
+    ('{"id": 1, "users": [{"name": "a", "tags": [1, 2, 3]}]}', 'users[0].tags'),
+    ('{"id": 1, "users": [{"name": "a"}, {}, {}, {}]}', 'users[1].name'),
+    ('{"id": 1, "users": [{"name": "a"}, {"name": "b"}, {"name": "c"}, {}]}', 'users'),
+    ('{"id": 1, "users": 1}', 'users'),
+    ('{"users": []}', 'id'),
+    ('[]', 'id'),
+]
+
+MALFORMED_CASES = [
+    '', '{', '{"id": 1,}', '{"id" 1}', '{"id": 1, "users": [{"name": "a"},]}',
+    '{"id": 1, "users": [{"name": "a"} {"name": "b"}]}', '{"id": 1} x',
+    '\ufeff{"id": 1}',
+]
+
+
+@pytest.fixture(params=['closure', 'codegen'])
+def compiler(request):
+    return Compiler(backend=request.param)
+
+
+@pytest.mark.parametrize('data', VALID_CASES)
+def test_valid(compiler, data):
+    f = compiler.compile_json(SCHEMA)
+    expect = compiler.compile(SCHEMA)(json.loads(data))
+    assert f(data) == expect
+    assert f(data.encode('utf-8')) == expect
+    assert f(data.encode('utf-16')) == expect
+    assert f(io.StringIO(data)) == expect
+
+
+@pytest.mark.parametrize('data,position', INVALID_CASES)
+def test_invalid(compiler, data, position):
+    f = compiler.compile_json(SCHEMA)
+    with pytest.raises(Invalid) as exinfo:
+        f(data)
+    assert exinfo.value.position == position
+
+
+@pytest.mark.parametrize('data', MALFORMED_CASES)
+def test_malformed(compiler, data):
+    f = compiler.compile_json(SCHEMA)
+    with pytest.raises(Invalid) as exinfo:
+        f(data)
+    assert 'invalid json' in exinfo.value.message
+
+
+def test_leaf_schema():
+    f = Compiler().compile_json(T.list(T.int).unique.minlen(2))
+    assert f('[1, "2"]') == [1, 2]
+    with pytest.raises(Invalid) as exinfo:
+        f('[1, 2, 1]')
+    assert exinfo.value.position == '[2]'
+    with pytest.raises(Invalid):
+        f('[1]')
+    assert Compiler().compile_json(T.int)(' 1 ') == 1
+    assert Compiler().compile_json(T.dict(x=T.int.optional).slim)('{"y": 1}') == {}
+    with pytest.raises(TypeError):
+        Compiler().compile_json(T.int)(1)
+
+
+def test_oversized_list_rejected_early():
+    f = Compiler().compile_json(T.list(T.int).maxlen(2))
+    # the rest items are not decoded, so the syntax error is not found
+    with pytest.raises(Invalid) as exinfo:
+        f('[1, 2, 3, oops')
+    assert 'length' in exinfo.value.message
+
+
+def test_schema_error():
+    with pytest.raises(SchemaError) as exinfo:
+        Compiler().compile_json(T.dict(users=T.list(T.unknown)))
+    assert exinfo.value.position == 'users[]'
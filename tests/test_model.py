@@ -1,3 +1,10 @@
+import collections
+import gc
+import pickle
+import threading
+from array import array
+from urllib.parse import urlparse
+
 import pytest
 from validr import (
     T,
@@ -8,6 +15,8 @@ from validr import (
     Invalid,
     ModelInvalid,
     ImmutableInstanceError,
+    SchemaError,
+    warmup,
 )
 
 from .helper import skipif_dict_not_ordered
@@ -56,6 +65,31 @@ class ImmutableModel:
         self.id = id
 
 
+@modelclass(slots=True)
+class SlotsModel:
+    id = T.int.min(0)
+    label = T.model(UserLabel).optional
+
+    def get_id(self):
+        return self.id
+
+
+class SlotsSubModel(SlotsModel):
+    name = T.str
+
+
+@modelclass(slots=True, immutable=True)
+class ImmutableSlotsModel:
+    id = T.int.min(0)
+    name = T.str.optional
+
+    def __init__(self, id=None):
+        self.id = id
+
+    def __repr__(self):
+        return 'Immutable' + super().__repr__()
+
+
 def test_model():
     user = User(name="test", label=dict(id=1, value='cool'))
     assert user.id == 100
@@ -212,3 +246,282 @@ def test_init():
         User(id=123, name="test", unknown=0)
     assert len(exinfo.value.errors) == 1
     assert 'undesired key' in str(exinfo.value)
+
+
+class _UserRow:
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def test_init_from_object():
+    assert User(_UserRow(id=100, name="x")) == User(id=100, name="x")
+    # absent attributes are None
+    assert User(_UserRow(name="x")) == User(id=100, name="x")
+    rows = [_UserRow(id=1), {'id': 2, 'name': 'y'}, _UserRow(id=3, name='z')]
+    users = User.construct_many(rows)
+    assert [(u.id, u.name) for u in users] == [(1, None), (2, 'y'), (3, 'z')]
+
+
+def test_slots():
+    m = SlotsModel(id='1', label=dict(id=1, value='cool'))
+    assert not hasattr(m, '__dict__')
+    assert m.get_id() == 1
+    assert m.label.value == 'cool'
+    assert m == SlotsModel(id=1, label=UserLabel(id=1, value='cool'))
+    assert asdict(m) == {'id': 1, 'label': {'id': 1, 'value': 'cool'}}
+    assert fields(SlotsModel) == {'id', 'label'}
+    m.id = '2'
+    assert m.id == 2
+    with pytest.raises(Invalid) as exinfo:
+        m.id = -1
+    assert exinfo.value.position == 'id'
+    with pytest.raises(AttributeError):
+        m.unknown = 1
+    with pytest.raises(ModelInvalid) as exinfo:
+        SlotsModel(id=-1)
+    assert 'id' in str(exinfo.value)
+    assert pickle.loads(pickle.dumps(m)) == m
+
+
+def test_slots_subclass():
+    m = SlotsSubModel(id=1, name='x')
+    assert m.id == 1 and m.name == 'x'
+    assert repr(m) == "SlotsSubModel(id=1, label=None, name='x')"
+    with pytest.raises(Invalid):
+        m.id = -1
+    with pytest.raises(Invalid):
+        m.name = None
+    assert pickle.loads(pickle.dumps(m)) == m
+
+
+class _TitleBase:
+
+    @property
+    def title(self):
+        return 'title'
+
+
+def test_slots_property_super():
+    @modelclass(slots=True)
+    class TitleModel(_TitleBase):
+        name = T.str
+
+        @property
+        def title(self):
+            return super().title + ':' + self.name
+
+        @title.setter
+        def title(self, value):
+            super().__setattr__('name', value)
+
+    m = TitleModel(name='x')
+    assert m.title == 'title:x'
+    m.title = 'y'
+    assert m.name == 'y'
+
+
+def test_slots_immutable():
+    m = ImmutableSlotsModel(id='1')
+    assert not hasattr(m, '__dict__')
+    assert m.id == 1
+    assert m.name is None
+    assert repr(m).startswith("Immutable<")
+    with pytest.raises(ImmutableInstanceError):
+        m.id = 2
+    with pytest.raises(ImmutableInstanceError):
+        del m.id
+    with pytest.raises(Invalid):
+        ImmutableSlotsModel(id=-1)
+    m2 = pickle.loads(pickle.dumps(m))
+    assert m2 == m
+    with pytest.raises(ImmutableInstanceError):
+        m2.id = 2
+
+
+@pytest.mark.parametrize('model', [User, SlotsSubModel])
+def test_construct(model):
+    data = {'id': 100, 'name': 'test', 'unknown': 'xxx'}
+    expect = model(id=100, name='test')
+    assert model.construct(id=100, name='test') == expect
+    assert model.from_trusted(data) == expect
+    assert model.from_trusted(expect) == expect
+    assert model.construct_many([data, expect]) == [expect, expect]
+    # trusted values are not validated
+    m = model.construct(id=-1)
+    assert m.id == -1
+    assert m.name is None
+    assert model.construct_many([]) == []
+
+
+def test_construct_post_init():
+    user = User.construct(id=100, name='test')
+    assert user.id_x2 == 200
+    assert user.id_x3 == 300
+
+
+def test_construct_immutable():
+    for model in [ImmutableModel, ImmutableSlotsModel]:
+        m = model.from_trusted({'id': 1})
+        assert m == model(id=1)
+        with pytest.raises(ImmutableInstanceError):
+            m.id = 2
+
+
+@modelclass
+class TaggedModel:
+    id = T.int
+    tags = T.list(T.str).optional
+    extra = T.dict(key=T.str).optional
+
+
+class CustomSetattrModel(TaggedModel):
+    def __setattr__(self, name, value):
+        if name == 'id':
+            value = value + 1
+        super().__setattr__(name, value)
+
+
+@skipif_dict_not_ordered()
+def test_asdict_plan():
+    tags = ['a', 'b']
+    m = TaggedModel(id=1, tags=tags, extra={'key': 'x'})
+    data = asdict(m)
+    assert list(data) == ['id', 'tags', 'extra']
+    assert data == {'id': 1, 'tags': ['a', 'b'], 'extra': {'key': 'x'}}
+    assert data['tags'] is not m.tags
+    assert asdict(m, keys=['tags', 'unknown']) == {'tags': ['a', 'b']}
+
+
+def test_asdict_object_output():
+    @modelclass
+    class UrlModel:
+        url = T.url.object
+        urls = T.list(T.url.object)
+
+    url = 'https://example.com/x'
+    m = UrlModel(url=url, urls=[url])
+    expect = list(urlparse(url))
+    # ParseResult are converted to lists as other tuples
+    assert asdict(m) == {'url': expect, 'urls': [expect]}
+    assert type(asdict(m)['url']) is list
+
+
+def test_asdict_array():
+    @modelclass
+    class ArrayModel:
+        values = T.list(T.float).array
+        nested = T.dict(values=T.list(T.float).array)
+        items = T.list(T.list(T.int).array)
+
+    m = ArrayModel(values=[1], nested={'values': [2]}, items=[[3]])
+    data = asdict(m)
+    # arrays are kept as is at top level and nested
+    assert data['values'] == array('d', [1])
+    assert data['nested']['values'] == array('d', [2])
+    assert data['items'][0] == array('q', [3])
+    assert type(data['values']) is array
+    assert type(data['nested']['values']) is array
+    assert type(data['items'][0]) is array
+
+
+_Point = collections.namedtuple('_Point', 'x y')
+
+
+@modelclass
+class RecordModel:
+    point = T.dict(x=T.int, y=T.int).record
+    points = T.list(T.dict(x=T.int, y=T.int).record).optional
+    extra = T.any.optional
+
+
+def test_asdict_record():
+    m = RecordModel(point={'x': 1, 'y': '2'}, points=[{'x': 3, 'y': 4}])
+    assert m.point.y == 2
+    assert asdict(m) == {'point': {'x': 1, 'y': 2}, 'points': [{'x': 3, 'y': 4}], 'extra': None}
+    # other namedtuples are not records
+    m = RecordModel(point={'x': 1, 'y': 2}, extra=_Point(5, 6))
+    assert asdict(m)['extra'] == [5, 6]
+
+
+def test_init_custom_setattr():
+    m = CustomSetattrModel(id=1)
+    assert m.id == 2
+    with pytest.raises(ModelInvalid) as exinfo:
+        CustomSetattrModel({'tags': 123}, id=1)
+    assert [ex.position for ex in exinfo.value.errors] == ['tags']
+
+
+def test_reuse_base_fields():
+    # inherited fields with same schema are compiled once
+    assert UserLabel.__model_fields__['id'] is MyModel.__model_fields__['id']
+    assert UserLabel.id is MyModel.id
+    # overridden fields are compiled again
+    assert User.__model_fields__['id'] is not MyModel.__model_fields__['id']
+    with pytest.raises(Invalid):
+        User(id=99, name='test')
+    assert UserLabel(id=99, value='x').id == 99
+
+
+def test_reuse_base_fields_strict_schema():
+    @modelclass
+    class Base:
+        x = T.any.default(1)
+
+    class Sub(Base):
+        x = T.any.default(True)
+
+    # default(1) and default(True) are equal schemas but not the same
+    assert Sub.__model_fields__['x'] is not Base.__model_fields__['x']
+    assert Sub().x is True
+    assert Base().x == 1
+
+
+@pytest.mark.parametrize('slots', [False, True])
+def test_lazy(slots):
+    @modelclass(lazy=True, slots=slots)
+    class LazyModel:
+        id = T.int.min(0)
+        name = T.str.optional
+
+    m = LazyModel(id='1')
+    assert m.id == 1
+    with pytest.raises(Invalid):
+        m.id = -1
+    with pytest.raises(ModelInvalid):
+        LazyModel(id=-1)
+
+
+def test_lazy_threads():
+    @modelclass(lazy=True)
+    class LazyModel:
+        id = T.int.min(0)
+        tags = T.list(T.str)
+
+    results = []
+
+    def target():
+        results.append(LazyModel(id=1, tags=['x']))
+
+    threads = [threading.Thread(target=target) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [LazyModel(id=1, tags=['x'])] * 8
+
+
+def test_lazy_schema_error():
+    @modelclass(lazy=True)
+    class BadModel:
+        id = T.int
+        name = T.unknown
+
+    with pytest.raises(SchemaError) as exinfo:
+        warmup()
+    assert exinfo.value.position == 'name'
+    with pytest.raises(SchemaError):
+        BadModel(id=1, name='x')
+    del BadModel, exinfo
+    gc.collect()
+    warmup()
@@ -0,0 +1,88 @@
+import io
+import json
+
+import pytest
+from validr import Compiler, SchemaError, T
+from validr.__main__ import main
+
+SCHEMA = {'id': 'int.min(0)', 'tags': ['str']}
+
+LINES = [
+    '{"id": 1, "tags": ["a"]}',
+    '{"id": -1, "tags": []}',
+    '',
+    '{"id": 2, "tags": ["b", 3]}',
+    '{"id": 3, "tags": [1, "x"], "unknown": null}',
+    '{"id": ',
+    '  ',
+    '{"id": 4, "tags": ["中"]}\r',
+    '{"id": "5", "tags": [{}]}',
+]
+
+EXPECT_VALID = [
+    {'id': 1, 'tags': ['a']},
+    {'id': 2, 'tags': ['b', '3']},
+    {'id': 3, 'tags': ['1', 'x']},
+    {'id': 4, 'tags': ['中']},
+]
+
+
+def _write_lines(tmp_path, lines, end='\n'):
+    path = tmp_path / 'data.jsonl'
+    path.write_bytes(('\n'.join(lines) + end).encode('utf-8'))
+    return path
+
+
+def _read_lines(data):
+    return [json.loads(x) for x in data.decode('utf-8').splitlines()]
+
+
+@pytest.mark.parametrize('workers,chunksize,end', [
+    (1, 16, '\n'),
+    (1, 1024, ''),
+    (2, 1, ''),
+    (2, 40, '\n'),
+])
+def test_validate_ndjson(tmp_path, workers, chunksize, end):
+    path = _write_lines(tmp_path, LINES, end=end)
+    output = io.BytesIO()
+    errors = io.BytesIO()
+    result = Compiler().validate_ndjson(
+        T(SCHEMA), path, output, errors, workers=workers, chunksize=chunksize)
+    assert result == (9, 4, 3)
+    assert _read_lines(output.getvalue()) == EXPECT_VALID
+    errors = _read_lines(errors.getvalue())
+    assert [x['line'] for x in errors] == [2, 6, 9]
+    assert [x['position'] for x in errors] == ['id', None, 'tags[0]']
+    assert 'invalid json' in errors[1]['message']
+
+
+def test_validate_ndjson_discard(tmp_path):
+    path = _write_lines(tmp_path, LINES)
+    result = Compiler().validate_ndjson(T(SCHEMA), path, workers=1)
+    assert result == (9, 4, 3)
+    empty = _write_lines(tmp_path, [], end='')
+    assert Compiler().validate_ndjson(T(SCHEMA), empty, workers=1) == (0, 0, 0)
+
+
+def test_validate_ndjson_error(tmp_path):
+    path = _write_lines(tmp_path, LINES)
+    with pytest.raises(SchemaError):
+        Compiler().validate_ndjson(T.unknown, path)
+    with pytest.raises(ValueError):
+        Compiler().validate_ndjson(T(SCHEMA), path, chunksize=0)
+
+
+def test_main(tmp_path):
+    schema_path = tmp_path / 'schema.json'
+    schema_path.write_text(json.dumps(SCHEMA))
+    path = _write_lines(tmp_path, LINES)
+    output = tmp_path / 'valid.jsonl'
+    errors = tmp_path / 'errors.jsonl'
+    argv = [str(schema_path), str(path), '-o', str(output), '-e', str(errors), '-w', '1']
+    assert main(argv) == 1
+    assert _read_lines(output.read_bytes()) == EXPECT_VALID
+    assert len(_read_lines(errors.read_bytes())) == 3
+    path = _write_lines(tmp_path, LINES[:1])
+    assert main(argv) == 0
+    assert errors.read_bytes() == b''
@@ -9,7 +9,8 @@ from . import case
         ('2016-07-09', '2016-07-09'),
         ('2016-7-9', '2016-07-09'),
         [
-            '2016-13-09', '07-09', '16-07-09',
+            '2016-13-09', '07-09', '16-07-09', '2015-02-29',
+            '2016-07-09 ', '2016-07-09x',
             '', None
         ]
     ],
@@ -22,6 +23,12 @@ from . import case
         ('2016/07/09', '2016/07/09'),
         ('2016/7/9', '2016/07/09'),
         ['2016-07-09', '07/09']
+    ],
+    T.date.format('%y%m%d %%'): [
+        (date(2016, 7, 9), '160709 %'),
+        ('690709 %', '690709 %'),
+        ('680709 %', '680709 %'),
+        ['160709', '2016-07-09', '160709 %%']
     ]
 })
 def test_date():
@@ -10,6 +10,8 @@ from . import case
         ('2016-07-09T00:00:00.000000Z', '2016-07-09T00:00:00.000000Z'),
         ('2016-07-09T00:00:00.123Z', '2016-07-09T00:00:00.123000Z'),
         ('2016-7-9T00:00:00.000000Z', '2016-07-09T00:00:00.000000Z'),
+        ('2016-07-09t00:00:00.000000z', '2016-07-09T00:00:00.000000Z'),
+        (datetime(999, 7, 9), datetime(999, 7, 9).strftime('%Y-%m-%dT%H:%M:%S.%fZ')),
         [
             '2016-07-09T00:00:00.000000',
             '2016-07-09 00:00:00.000000Z',
@@ -30,6 +32,11 @@ from . import case
             '2016-07-09 00:00:00',
         ]
     ],
+    T.datetime.format('%d %b %Y %H:%M'): [
+        (datetime(2016, 7, 9, 14, 47), '09 Jul 2016 14:47'),
+        ('9 jul 2016 14:47', '09 Jul 2016 14:47'),
+        ['09 07 2016 14:47', '09 Jul 2016']
+    ],
 })
 def test_datetime():
     pass
@@ -1,3 +1,5 @@
+import pickle
+
 import pytest
 from validr import Compiler, T, Invalid, SchemaError
 
@@ -123,3 +125,187 @@ def test_slim_dict(schema):
     f = compiler.compile(schema)
     data = {'key1': '', 'key2': None, 'key3': 'xxx'}
     assert f(data) == {'key3': 'xxx'}
+
+
+WIDE_SCHEMA = T.dict(
+    id=T.int,
+    count=T.int.default(0),
+    kind=T.enum('a b').optional,
+    tags=T.list(T.str).optional,
+    info=T.dict(name=T.str).optional,
+    **{'f%d' % i: T.str.optional for i in range(40)},
+)
+
+
+@pytest.mark.parametrize('compiler', [
+    Compiler(),
+    Compiler(backend='codegen'),
+])
+@pytest.mark.parametrize('value', [
+    {'id': 1},
+    {'id': '1', 'f3': 'x', 'f30': 3, 'unknown': 1},
+    {'f39': 'x', 'id': 1, 'kind': None, 'tags': ['a'], 'count': '2'},
+    {'id': 1, 'info': {'name': 'x'}, 'f0': None},
+])
+def test_sparse_dict(compiler, value):
+    f = compiler.compile(WIDE_SCHEMA)
+    dense_value = {k: value.get(k) for k in WIDE_SCHEMA.__schema__.items}
+    expect = f(dense_value)
+    result = f(value)
+    assert result == expect
+    assert list(result) == list(expect)
+    assert compiler.compile_result(WIDE_SCHEMA)(value) == (expect, None)
+
+
+@pytest.mark.parametrize('compiler', [
+    Compiler(),
+    Compiler(backend='codegen'),
+])
+@pytest.mark.parametrize('value,position', [
+    ({}, 'id'),
+    ({'f1': 'x'}, 'id'),
+    ({'id': None, 'f1': 'x'}, 'id'),
+    ({'id': 1, 'f1': 'x', 'kind': 'c'}, 'kind'),
+    ({'id': 1, 'f1': [1]}, 'f1'),
+    ({'id': 1, 'info': {}}, 'info.name'),
+    # errors in order of schema
+    ({'id': 1, 'f1': [1], 'kind': 'c'}, 'kind'),
+])
+def test_sparse_dict_error(compiler, value, position):
+    f = compiler.compile(WIDE_SCHEMA)
+    with pytest.raises(Invalid) as exinfo:
+        f(value)
+    assert exinfo.value.position == position
+    _, error = compiler.compile_result(WIDE_SCHEMA)(value)
+    assert error.position == position
+
+
+@pytest.mark.parametrize('compiler', [
+    Compiler(),
+    Compiler(backend='codegen'),
+])
+def test_sparse_dict_iterator(compiler):
+    schema = T.dict(nums=T.list(T.int), **{'f%d' % i: T.str.optional for i in range(40)})
+    f = compiler.compile(schema)
+    # iterators are consumed once, the invalid item must be reported
+    with pytest.raises(Invalid) as exinfo:
+        f({'nums': (x for x in [1, 'x', 2])})
+    assert exinfo.value.position == 'nums[1]'
+    assert f({'nums': iter([1, 2])})['nums'] == [1, 2]
+
+
+class _SlotsUser:
+    __slots__ = ('userid', 'name')
+
+    def __init__(self, userid, name=None):
+        self.userid = userid
+        if name is not None:
+            self.name = name
+
+
+class _PropertyUser:
+
+    userid = 1
+
+    @property
+    def name(self):
+        raise AttributeError('name')
+
+
+class _ProxyUser:
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+
+    def __getattr__(self, name):
+        try:
+            return self._kwargs[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+class _UserDict(dict):
+    pass
+
+
+@pytest.mark.parametrize('value', [
+    {'userid': '1', 'name': 'x'},
+    _UserDict(userid='1', name='x'),
+    _SlotsUser(1, 'x'),
+    _ProxyUser(userid=1, name='x'),
+])
+def test_dict_value_types(value):
+    f = compiler.compile(T.dict(userid=T.int, name=T.str.optional))
+    assert f(value) == {'userid': 1, 'name': 'x'}
+    assert f(value) == {'userid': 1, 'name': 'x'}
+
+
+def test_dict_value_type_checked_once():
+    class InstanceGetUser:
+        userid = 1
+        name = 'x'
+
+        def __init__(self):
+            # not a mapping, the get method is not defined on the type
+            self.get = lambda key, default=None: 'unknown'
+
+        def __getitem__(self, key):
+            raise KeyError(key)
+
+    f = compiler.compile(T.dict(userid=T.int, name=T.str.optional))
+    # the first and later calls are the same
+    assert f(InstanceGetUser()) == {'userid': 1, 'name': 'x'}
+    assert f(InstanceGetUser()) == {'userid': 1, 'name': 'x'}
+
+
+def test_dict_absent_attributes():
+    f = compiler.compile(T.dict(userid=T.int, name=T.str.optional))
+    assert f(_SlotsUser(1)) == {'userid': 1, 'name': ''}
+    assert f(_PropertyUser()) == {'userid': 1, 'name': ''}
+    assert f(_ProxyUser(userid=1)) == {'userid': 1, 'name': ''}
+    with pytest.raises(Invalid) as exinfo:
+        f(_ProxyUser(name='x'))
+    assert exinfo.value.position == 'userid'
+    # dotted keys are not nested attributes
+    f = compiler.compile(T.dict(userid=T.int, **{'user.name': T.str.optional}))
+    user = _ProxyUser(userid=1, user=_ProxyUser(name='x'))
+    assert f(user) == {'userid': 1, 'user.name': ''}
+
+
+@pytest.mark.parametrize('compiler', [
+    Compiler(),
+    Compiler(backend='codegen'),
+])
+def test_record(compiler):
+    schema = T.dict(id=T.int, tags=T.list(T.str), info=T.dict(x=T.int).record.optional).record
+    f = compiler.compile(schema)
+    record = f({'id': '1', 'tags': ['a'], 'info': {'x': 2}, 'unknown': 0})
+    assert isinstance(record, tuple)
+    assert record == (1, ['a'], (2,))
+    assert record.id == 1
+    assert record.info.x == 2
+    assert record._asdict() == {'id': 1, 'tags': ['a'], 'info': record.info}
+    assert f({'id': 1, 'tags': []}).info is None
+    # same fields share record class
+    assert type(compiler.compile(T.dict(id=T.int, tags=T.list, info=T.any).record)(record)) is type(record)
+    copied = pickle.loads(pickle.dumps(record))
+    assert copied == record
+    assert type(copied) is type(record)
+    with pytest.raises(Invalid) as exinfo:
+        f({'id': 1, 'tags': [], 'info': {'x': 'x'}})
+    assert exinfo.value.position == 'info.x'
+    _, error = compiler.compile_result(schema)({'id': 'x', 'tags': []})
+    assert error.position == 'id'
+
+
+@pytest.mark.parametrize('schema', [
+    T.dict.record,
+    T.dict(id=T.int).key(T.str).record,
+    T.dict(id=T.int).slim.record,
+    T.dict(_id=T.int).record,
+    T.dict(**{'class': T.int}).record,
+    T.dict(**{'a-b': T.int}).record,
+])
+def test_record_schema_error(schema):
+    with pytest.raises(SchemaError):
+        compiler.compile(schema)
@@ -1,6 +1,8 @@
+from array import array
+
 import pytest
 
-from validr import T, SchemaError
+from validr import Compiler, Invalid, SchemaError, T
 from . import case, compiler
 
 
@@ -95,3 +97,81 @@ def test_unable_check_unique(schema):
     with pytest.raises(SchemaError) as exinfo:
         compiler.compile(schema)
     assert 'unable to check unique' in exinfo.value.message
+
+
+@pytest.mark.parametrize('value,expect', [
+    ([1, '2', 3.5], [1, 2, 3.5]),
+    (array('d', [1, 2.5]), [1, 2.5]),
+    (array('f', [0.5]), [0.5]),
+    (array('i', [1, 2]), [1, 2]),
+    (array('d'), []),
+    ((x for x in [1, 2]), [1, 2]),
+])
+def test_array(value, expect):
+    f = compiler.compile(T.list(T.float.min(0).exmax(10)).array)
+    result = f(value)
+    assert type(result) is array
+    assert result.typecode == 'd'
+    assert result.tolist() == expect
+
+
+@pytest.mark.parametrize('value,position', [
+    ([1, 10], '[1]'),
+    (array('d', [1, -1]), '[1]'),
+    (array('i', [1, 2, 10]), '[2]'),
+    # NaN in array, fallback to validate items one by one
+    (array('d', [float('nan'), 11]), '[1]'),
+    (array('d', [1, float('nan'), 11]), '[2]'),
+])
+def test_array_invalid(value, position):
+    f = compiler.compile(T.list(T.float.min(0).exmax(10)).array)
+    with pytest.raises(Invalid) as exinfo:
+        f(value)
+    assert exinfo.value.position == position
+
+
+def test_array_int():
+    f = compiler.compile(T.list(T.int.min(0)).array.unique.maxlen(3))
+    assert f(array('q', [1, 2, 3])) == array('q', [1, 2, 3])
+    assert f(array('B', [1, 2])) == array('q', [1, 2])
+    # float items are converted by int validator
+    assert f(array('d', [1.5, 2.5])) == array('q', [1, 2])
+    for value, position in [
+        (array('q', [1, -2]), '[1]'),
+        (array('q', [1, 1]), '[1]'),
+        (array('Q', [2**64 - 1]), '[0]'),
+        ([1, 2**63], '[1]'),
+        (array('q', [1, 2, 3, 4]), ''),
+    ]:
+        with pytest.raises(Invalid) as exinfo:
+            f(value)
+        assert exinfo.value.position == position
+
+
+def test_array_reuse():
+    value = array('q', [1, 2])
+    assert Compiler(reuse=True).compile(T.list(T.int).array)(value) is value
+    assert compiler.compile(T.list(T.int).array)(value) is not value
+    assert Compiler(backend='codegen').compile(
+        T.dict(x=T.list(T.int).array))({'x': value}) == {'x': value}
+
+
+def test_array_numpy():
+    np = pytest.importorskip('numpy')
+    f = compiler.compile(T.list(T.float.max(1)).array)
+    assert f(np.array([0.5, 1], dtype='float32')) == array('d', [0.5, 1])
+    assert f(np.arange(4)[::2]) == array('d', [0, 2])
+    with pytest.raises(Invalid) as exinfo:
+        f(np.array([0.5, 1.5]))
+    assert exinfo.value.position == '[1]'
+
+
+@pytest.mark.parametrize('schema', [
+    T.list.array,
+    T.list(T.str).array,
+    T.list(T.bool).array,
+    T.list(T.int.optional).array,
+])
+def test_array_schema_error(schema):
+    with pytest.raises(SchemaError):
+        compiler.compile(schema)
@@ -24,6 +24,81 @@ def test_model():
     pass
 
 
+@modelclass
+class MutableUser:
+    name = T.str
+    tags = T.list(T.str).optional
+
+    def __post_init__(self):
+        self.post_init_count = getattr(self, 'post_init_count', 0) + 1
+
+
+class AdminUser(User):
+    pass
+
+
+def test_model_instance_passthrough():
+    f = compiler.compile(T.model(User))
+    user = User(name='kk', age=12)
+    assert f(user) is user
+    # instance of other class is validated
+    admin = f(AdminUser(name='kk', age=12))
+    assert type(admin) is User
+    assert admin == user
+
+
+def test_mutable_model_instance_copy():
+    f = compiler.compile(T.model(MutableUser))
+    user = MutableUser(name='kk', tags=['a'])
+    copied = f(user)
+    assert copied is not user
+    assert copied == user
+    assert copied.post_init_count == 1
+    copied.name = 'xx'
+    assert user.name == 'kk'
+    # containers are copied
+    assert copied.tags is not user.tags
+    copied.tags.append('b')
+    assert user.tags == ['a']
+
+
+@modelclass
+class NestedUser:
+    user = T.model(MutableUser)
+    users = T.list(T.model(MutableUser))
+    info = T.dict(tags=T.list(T.str))
+
+
+def test_nested_model_instance_copy():
+    f = compiler.compile(T.model(NestedUser))
+    user = MutableUser(name='kk', tags=['a'])
+    value = NestedUser(user=user, users=[user], info={'tags': ['x']})
+    copied = f(value)
+    assert copied == value
+    assert copied.user is not value.user
+    assert copied.users[0] is not value.users[0]
+    assert copied.info is not value.info
+    assert copied.info['tags'] is not value.info['tags']
+
+
+@modelclass
+class InitUser:
+    name = T.str
+
+    def __init__(self, user=None):
+        self.name = getattr(user, 'name', user)
+        self.extra = 'x'
+
+
+def test_custom_init_model_instance():
+    f = compiler.compile(T.model(InitUser))
+    user = InitUser('kk')
+    copied = f(user)
+    assert copied is not user
+    assert copied == user
+    assert copied.extra == 'x'
+
+
 def test_union_list_model():
     schema = T.union([T.model(User), T.int])
     f = compiler.compile(schema)
@@ -1,7 +1,110 @@
+import datetime
+import threading
+
 import pytest
-from validr import T, SchemaError, Compiler
+from validr import T, Invalid, SchemaError, Compiler
 
 
 def test_invalid_default():
     with pytest.raises(SchemaError):
         Compiler().compile(T.int.default('abc'))
+
+
+@pytest.mark.parametrize('backend', ['closure', 'codegen'])
+def test_cache(backend):
+    compiler = Compiler(backend=backend)
+    f = compiler.compile(T.dict(email=T.email.cache(2)))
+    email = compiler.compile(T.email.cache(2))
+    assert not hasattr(compiler.compile(T.email), 'cache_info')
+    assert f({'email': 'a@example.com'}) == {'email': 'a@example.com'}
+    for _ in range(2):
+        with pytest.raises(Invalid) as exinfo:
+            f({'email': 'x'})
+        assert exinfo.value.position == 'email'
+        assert exinfo.value.value == 'x'
+    assert email('a@example.com') == 'a@example.com'
+    assert email('a@example.com') == 'a@example.com'
+    info = email.cache_info()
+    assert (info.hits, info.misses, info.maxsize, info.currsize) == (1, 1, 2, 1)
+    email.cache_clear()
+    assert email.cache_info().currsize == 0
+
+
+def test_cache_reuse():
+    f = Compiler(reuse=True).compile(T.email.cache(10))
+    value = 'a@example.com'
+    assert f(value) is value
+    assert f(value) is value
+    assert f.cache_info().hits == 1
+    f.cache_clear()
+    assert f.cache_info().currsize == 0
+
+
+def test_cache_str_only():
+    f = Compiler().compile(T.str.cache(8))
+    assert f(1) == '1'
+    assert f(True) == 'True'
+    assert f('1') == '1'
+    assert f('1') == '1'
+    info = f.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+
+def test_cache_unhashable():
+    f = Compiler().compile(T.any.cache(8))
+    assert f([1]) == [1]
+    assert f.cache_info().currsize == 0
+
+
+_UTC = datetime.timezone.utc
+_PLUS1 = datetime.timezone(datetime.timedelta(hours=1))
+
+
+@pytest.mark.parametrize('schema,values', [
+    (T.datetime, [datetime.datetime(2020, 1, 1, 12, tzinfo=_UTC),
+                  datetime.datetime(2020, 1, 1, 13, tzinfo=_PLUS1)]),
+    (T.time, [datetime.time(12, tzinfo=_UTC), datetime.time(13, tzinfo=_PLUS1)]),
+    (T.float, [0.0, -0.0]),
+])
+def test_cache_equal_values(schema, values):
+    # equal values of different results are not shared by cache
+    f = Compiler().compile(schema.cache(10))
+    uncached = Compiler().compile(schema)
+    for value in values:
+        expect = uncached(value)
+        assert f(value) == expect
+        assert repr(f(value)) == repr(expect)
+
+
+@pytest.mark.parametrize('schema', [
+    T.str.cache(-1),
+    T.str.cache('x'),
+    T.email.cache,
+    T.email.cache(True),
+    T.list(T.int).cache(8),
+    T.dict(x=T.int).cache(8),
+])
+def test_cache_schema_error(schema):
+    with pytest.raises(SchemaError):
+        Compiler().compile(schema)
+
+
+def test_cache_threads():
+    f = Compiler().compile(T.int.min(0).cache(16))
+    errors = []
+
+    def worker():
+        for i in range(-100, 100):
+            try:
+                assert f(str(i)) == i
+            except Invalid as ex:
+                if i >= 0 or ex.value != str(i):
+                    errors.append(ex)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert f.cache_info().currsize == 16
@@ -15,7 +15,7 @@ def pyx_to_py(text: str, debug=False):
                 if line.lstrip().startswith(t) and line.rstrip().endswith(':'):
                     line = line.replace(t, 'def')
         for pre in ['cdef', 'cpdef']:
-            for t in ['bint', 'str', 'int', 'float', 'dict', 'list']:
+            for t in ['bint', 'str', 'int', 'float', 'dict', 'list', 'object']:
                 cdef_t = '{} {} '.format(pre, t)
                 if line.lstrip().startswith(cdef_t):
                     if '=' in line: